@@ -1,29 +1,59 @@
-from nicegui import app, ui
+import logging
+
+from nicegui import app, background_tasks, ui
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.backend.endpoints import login, users, items
+from src.backend.endpoints import debug, login, users, items
+from src.backend.middleware import RequestLoggingMiddleware, TracingMiddleware
 from src.core.config import settings
+from src.core.logs import logging_pipeline
+from src.core.tracing import tracer
 from src.db import init_db
+from src.frontend.client_monitor import client_monitor
+from src.frontend.data_access import loop_lag, ui_db
+from src.repositories.item_cache import item_list_cache
+from src.services.item_changes import prune_item_tombstones_periodically
+from src.services.item_stats import reconcile_item_stats_periodically
+from src.services.user_import import password_hasher
 
 # ruff: noqa: F401
 from src.frontend.pages import (
     home,
     create_user,
+    import_users,
     items as items_page,
     login as login_page,
 )
 
+logging_pipeline.start()
+tracer.start()
+logger = logging.getLogger(__name__)
+
 
 async def on_startup():
     """Initializes the database on application startup."""
-    print("INFO:     Initializing database...")
+    logger.info("Initializing database...")
     init_db.init()
-    print("INFO:     Database initialization complete.")
+    logger.info("Database initialization complete.")
+    item_list_cache.start_sync()
+    background_tasks.create(
+        reconcile_item_stats_periodically(), name="reconcile_item_stats"
+    )
+    background_tasks.create(
+        prune_item_tombstones_periodically(), name="prune_item_tombstones"
+    )
+    background_tasks.create(client_monitor.run_periodically(), name="client_monitor")
+    background_tasks.create(loop_lag.run_periodically(), name="loop_lag")
 
 
 async def on_shutdown():
     """Actions to perform on application shutdown."""
-    print("INFO:     Application shutting down.")
+    logger.info("Application shutting down.", extra=logging_pipeline.stats())
+    ui_db.shutdown()
+    password_hasher.shutdown()
+    item_list_cache.stop_sync()
+    tracer.stop()
+    logging_pipeline.stop()
 
 
 app.on_startup(on_startup)
@@ -38,11 +68,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware)
+app.add_middleware(RequestLoggingMiddleware)
 
 # API Routers
 app.include_router(login.router, tags=["login"])
 app.include_router(users.router, prefix="/api/v1", tags=["users"])
 app.include_router(items.router, prefix="/api/v1", tags=["items"])
+app.include_router(debug.router, prefix="/debug", tags=["debug"])
 
 if __name__ in {"__main__", "__mp_main__"}:
     ui.run(
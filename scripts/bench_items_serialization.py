@@ -0,0 +1,121 @@
+"""
+Compares the two serialization paths for the item list endpoint:
+
+- orm: ORM Item objects validated through response_model=List[ItemRead], then json.dumps
+  (what FastAPI does for a returned list of models).
+- fast: ItemRead columns selected as plain rows and encoded with orjson.
+
+Run from the project root (settings are read from .env):
+
+    python -m scripts.bench_items_serialization --rows 5000 --repeat 20
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, List, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.core.config import settings
+from src.models import Item, ItemRead, User
+from src.repositories.item import item_repo
+from src.backend.responses import fast_json_response
+
+ITEM_LIST = TypeAdapter(List[ItemRead])
+
+
+class _PlainRequest:
+    """Stands in for a request that does not accept gzip."""
+
+    headers: dict = {}
+
+
+def seed(rows: int) -> Tuple[Session, User]:
+    """Creates an in-memory database holding `rows` items for one superuser."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    db = Session(engine)
+    owner = User(email="bench@local.dev", hashed_password="x", is_superuser=True)
+    db.add(owner)
+    db.commit()
+    db.refresh(owner)
+    db.exec(
+        insert(Item),
+        params=[
+            {
+                "title": f"Item {i}",
+                "description": f"Description of item {i} " * 4,
+                "owner_id": owner.id,
+            }
+            for i in range(rows)
+        ],
+    )
+    db.commit()
+    return db, owner
+
+
+def orm_path(db: Session, owner: User, rows: int) -> bytes:
+    """Mirrors FastAPI's response_model handling of a returned list of ORM objects."""
+    items = item_repo.get_multi(db, limit=rows)
+    validated = ITEM_LIST.validate_python(items, from_attributes=True)
+    content = ITEM_LIST.dump_python(validated, mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_path(db: Session, owner: User, rows: int) -> bytes:
+    """Mirrors read_items: plain column rows encoded by fast_json_response."""
+    content = item_repo.get_rows_for_user(db, current_user=owner, limit=rows)
+    return fast_json_response(content, _PlainRequest()).body
+
+
+def measure(fn: Callable[[], bytes], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    # Measure serialization on every run, not hits of the item list cache
+    settings.ITEM_CACHE_MAX_ROWS = 0
+
+    db, owner = seed(args.rows)
+
+    orm_body = orm_path(db, owner, args.rows)
+    fast_body = fast_path(db, owner, args.rows)
+    if json.loads(orm_body) != json.loads(fast_body):
+        raise SystemExit("Paths disagree: the fast path is not schema-identical.")
+    print(
+        f"Outputs identical ({len(fast_body)} bytes, byte-equal: {orm_body == fast_body})"
+    )
+
+    for name, fn in (
+        ("orm", lambda: orm_path(db, owner, args.rows)),
+        ("fast", lambda: fast_path(db, owner, args.rows)),
+    ):
+        timings = measure(fn, args.repeat)
+        print(
+            f"{name:>5}: median {statistics.median(timings):8.2f} ms"
+            f"  min {min(timings):8.2f} ms  ({args.rows} rows, {args.repeat} runs)"
+        )
+
+
+if __name__ == "__main__":
+    main()
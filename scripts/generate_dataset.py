@@ -0,0 +1,256 @@
+"""
+Fills the database with synthetic users and items for scale testing.
+
+Items are spread over owners with a Zipf distribution (--skew), so a few owners hold most
+items and many hold only a handful, as in production. Titles and descriptions are built
+from a fixed vocabulary with realistic, long-tailed lengths. Everything is derived from
+--seed: the same arguments always produce the same users and item contents, regardless of
+--batch-size. All users share one password (--password), hashed once up front.
+
+Rows are written with executemany in batches of --batch-size, one transaction per batch.
+Items go to their owner's shard when ITEM_SHARDS is set. Item statistics are reconciled
+and change feed positions assigned afterwards. Emails embed the seed, so datasets of different seeds can coexist.
+
+Run from the project root (settings are read from .env):
+
+    python -m scripts.generate_dataset --users 10000 --items 1000000 --seed 42
+"""
+
+import argparse
+import itertools
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from src.core.security import get_password_hash
+from src.db import init_db
+from src.db.session import engine as main_engine
+from src.db.shards import SHARD_ID_SPAN, shard_router
+from src.models import Item, User
+from src.repositories.item_changes import item_change_repo
+from src.repositories.item_stats import item_stats_repo
+
+USERS = User.__table__
+ITEMS = Item.__table__
+
+# Items are written as plain tuples straight to the SQLite driver: at millions of rows,
+# building and binding per-row dicts through SQLAlchemy costs more than the inserts.
+INSERT_ITEM_SQL = "INSERT INTO item (title, description, owner_id) VALUES (?, ?, ?)"
+INSERT_ITEM_WITH_ID_SQL = (
+    "INSERT INTO item (title, description, owner_id, id) VALUES (?, ?, ?, ?)"
+)
+
+WORDS = (
+    "account action agenda alpha analysis archive asset audit backlog badge balance "
+    "batch benchmark billing board bonus branch budget build bundle cache campaign "
+    "catalog channel checklist client cluster coffee config contract cost coupon "
+    "customer dashboard data deadline delivery demo deploy design draft estimate event "
+    "export feature feedback filter forecast garden gift goal grocery guide habit "
+    "holiday idea import inbox invoice kitchen launch lead ledger library list "
+    "logistics meeting memo metric migration milestone mobile module note offer "
+    "onboarding order outline package payment plan playlist policy portfolio priority "
+    "project proposal prototype purchase quarterly quote receipt recipe release "
+    "renewal report request research review roadmap sample schedule script service "
+    "shipment sketch sprint status subscription summary supplier survey task team "
+    "template ticket timeline training travel update upgrade vendor version weekly "
+    "wishlist workshop"
+).split()
+
+FIRST_NAMES = (
+    "Ada Alan Ana Ben Chen Dana Eli Emma Farah Grace Hana Ivan Jin Kai Lena Luis Maya "
+    "Mei Nina Omar Priya Ravi Sara Tom Uma Yara Zoe"
+).split()
+LAST_NAMES = (
+    "Ahmed Brown Costa Diaz Evans Garcia Hoang Ivanova Khan Kim Lee Martin Nakamura "
+    "Nguyen Novak Okafor Patel Rossi Silva Smith Tanaka Weber Wong Yilmaz"
+).split()
+
+
+def owner_weights(users: int, skew: float) -> List[float]:
+    """Cumulative Zipf weights: the owner of rank r gets 1 / r**skew of the items."""
+    return list(itertools.accumulate(1 / rank**skew for rank in range(1, users + 1)))
+
+
+class TextGenerator:
+    """
+    Builds titles and descriptions as slices of a word corpus drawn once from the seed.
+    Slicing keeps generation to a few random draws per item, however long the text.
+    """
+
+    CORPUS_WORDS = 1 << 16
+
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+        self.corpus = rng.choices(WORDS, k=self.CORPUS_WORDS)
+
+    def _words(self, length: int) -> str:
+        start = int(self.rng.random() * (self.CORPUS_WORDS - length))
+        return " ".join(self.corpus[start : start + length]).capitalize()
+
+    def title(self, number: int) -> str:
+        """A 2-7 word title. The item number keeps titles unique per owner."""
+        return f"{self._words(2 + int(self.rng.random() * 6))} #{number}"
+
+    def description(self) -> Optional[str]:
+        """A description of log-normally distributed length (median ~20 words), or None for 15% of items."""
+        if self.rng.random() < 0.15:
+            return None
+        length = min(max(int(self.rng.lognormvariate(3.0, 0.8)), 1), 400)
+        return self._words(length) + "."
+
+
+def insert_users(args: argparse.Namespace, hashed_password: str) -> List[int]:
+    """Inserts the synthetic users in batches and returns their IDs in creation order."""
+    rng = random.Random(f"{args.seed}:users")
+    user_ids: List[int] = []
+    for start in range(0, args.users, args.batch_size):
+        rows = [
+            {
+                "email": f"user{args.seed}-{n}@{args.email_domain}",
+                "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "hashed_password": hashed_password,
+                "is_active": True,
+                "is_superuser": False,
+            }
+            for n in range(start, min(start + args.batch_size, args.users))
+        ]
+        with main_engine.begin() as conn:
+            result = conn.execute(
+                insert(USERS).returning(USERS.c.id, sort_by_parameter_order=True),
+                rows,
+            )
+            user_ids.extend(result.scalars())
+    return user_ids
+
+
+def next_item_ids() -> Dict[Optional[int], int]:
+    """First free item ID per shard (keyed None when unsharded, where SQLite assigns IDs)."""
+    next_ids: Dict[Optional[int], int] = {}
+    for shard, engine in enumerate(shard_router.engines):
+        first = (shard + 1) * SHARD_ID_SPAN
+        with engine.connect() as conn:
+            last_used = conn.execute(
+                select(func.max(ITEMS.c.id)).where(
+                    ITEMS.c.id >= first, ITEMS.c.id < first + SHARD_ID_SPAN
+                )
+            ).scalar()
+        next_ids[shard] = (last_used or first - 1) + 1
+    return next_ids
+
+
+def insert_items(args: argparse.Namespace, user_ids: List[int]) -> Counter:
+    """Inserts the synthetic items in batches. Returns the number of items per owner."""
+    owner_rng = random.Random(f"{args.seed}:owners")
+    text = TextGenerator(random.Random(f"{args.seed}:text"))
+    # Shuffle which user gets which popularity rank, so the busiest owners are not simply the first IDs
+    ranked = user_ids[:]
+    owner_rng.shuffle(ranked)
+    cum_weights = owner_weights(len(ranked), args.skew)
+    next_ids = next_item_ids()
+
+    per_owner: Counter = Counter()
+    for start in range(0, args.items, args.batch_size):
+        count = min(args.batch_size, args.items - start)
+        owners = owner_rng.choices(ranked, cum_weights=cum_weights, k=count)
+        by_shard: Dict[Optional[int], List[tuple]] = defaultdict(list)
+        for number, owner_id in enumerate(owners, start):
+            shard = (
+                shard_router.shard_for_owner(owner_id) if shard_router.enabled else None
+            )
+            row = (text.title(number), text.description(), owner_id)
+            if shard is not None:
+                row += (next_ids[shard],)
+                next_ids[shard] += 1
+            by_shard[shard].append(row)
+            per_owner[owner_id] += 1
+        for shard, rows in by_shard.items():
+            engine: Engine = (
+                main_engine if shard is None else shard_router.engines[shard]
+            )
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    INSERT_ITEM_WITH_ID_SQL if shard is not None else INSERT_ITEM_SQL,
+                    rows,
+                )
+        print(f"\r{start + count}/{args.items} items", end="", flush=True)
+    print()
+    return per_owner
+
+
+def reconcile_stats() -> int:
+    """Brings the per-owner item statistics in line with the loaded items."""
+    engines = shard_router.engines if shard_router.enabled else [main_engine]
+    fixed = 0
+    for engine in engines:
+        with Session(engine) as db:
+            fixed += item_stats_repo.reconcile(db)
+    return fixed
+
+
+def assign_change_seqs() -> int:
+    """Places the loaded items in the change feed, which the raw inserts leave out."""
+    engines = shard_router.engines if shard_router.enabled else [main_engine]
+    assigned = 0
+    for engine in engines:
+        with Session(engine) as db:
+            assigned += item_change_repo.backfill(db)
+    return assigned
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--skew",
+        type=float,
+        default=1.1,
+        help="Zipf exponent of items per owner; 0 spreads items uniformly.",
+    )
+    parser.add_argument("--password", default="synthetic-password")
+    parser.add_argument("--email-domain", default="synthetic.example.com")
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    args = parser.parse_args()
+    if args.users < 1:
+        raise SystemExit("--users must be at least 1.")
+
+    init_db.init()
+    with Session(main_engine) as db:
+        first_email = f"user{args.seed}-0@{args.email_domain}"
+        if db.exec(select(User.id).where(User.email == first_email)).first():
+            raise SystemExit(
+                f"A dataset with seed {args.seed} is already loaded ({first_email} exists)."
+            )
+
+    started = time.perf_counter()
+    user_ids = insert_users(args, get_password_hash(args.password))
+    users_done = time.perf_counter()
+    print(f"{len(user_ids)} users in {users_done - started:.1f}s")
+
+    per_owner = insert_items(args, user_ids)
+    items_done = time.perf_counter()
+    print(
+        f"{args.items} items in {items_done - users_done:.1f}s"
+        f" ({args.items / max(items_done - users_done, 1e-9):,.0f} rows/s)"
+    )
+
+    fixed = reconcile_stats()
+    print(f"Item statistics reconciled, {fixed} owners corrected.")
+    print(f"Change feed positions assigned to {assign_change_seqs()} items.")
+
+    counts = sorted((per_owner[user_id] for user_id in user_ids), reverse=True)
+    print(
+        f"Items per owner: max {counts[0]}, median {statistics.median(counts):g},"
+        f" owners without items {counts.count(0)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Moves item rows to the shard their owner hashes to under the current ITEM_SHARDS setting.
+
+Rows are read from the unsharded item table in DATABASE_URL (when migrating to sharded mode)
+and from every shard file, including files beyond the current shard count (when shrinking),
+and moved in batches. Item IDs are preserved; each shard's ID sequence keeps the IDs of rows
+moved away from being handed out again. Inserts ignore rows that already exist, so an
+interrupted run can simply be repeated. Item statistics are reconciled afterwards, and moved
+items get new change feed positions on their new shard (consumers see them as upserts).
+
+Run from the project root after changing ITEM_SHARDS (settings are read from .env):
+
+    python -m scripts.rebalance_item_shards --source-shards 4 --dry-run
+"""
+
+import argparse
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, inspect, insert, select
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel
+
+from src.db.init_db import add_missing_columns
+from src.db.session import create_db_engine, engine as main_engine
+from src.db.shards import SHARDED_TABLES, shard_router
+from src.models import Item, ItemIdSequence
+from src.repositories.item_changes import item_change_repo
+from src.repositories.item_stats import item_stats_repo
+
+ITEMS = Item.__table__
+
+
+def source_engines(source_shards: int) -> List[Tuple[str, Engine, Optional[int]]]:
+    """Lists every database that may hold items, with the shard index it stands for."""
+    sources = [("main", main_engine, None)]
+    for shard in range(max(source_shards, shard_router.count)):
+        engine = (
+            shard_router.engines[shard]
+            if shard < shard_router.count
+            else create_db_engine(shard_router.url_for(shard))
+        )
+        sources.append((f"shard {shard}", engine, shard))
+    return [source for source in sources if inspect(source[1]).has_table(ITEMS.name)]
+
+
+def rebalance_source(
+    label: str, engine: Engine, shard: Optional[int], batch_size: int, dry_run: bool
+) -> Counter:
+    """Moves misplaced rows out of one database. Returns the number moved per target shard."""
+    moved: Counter = Counter()
+    if shard is not None and not dry_run:
+        # Record the shard's highest ID before rows leave it, so it never hands them out again
+        SQLModel.metadata.create_all(engine, tables=[ItemIdSequence.__table__])
+        with Session(engine) as db:
+            shard_router.allocate_shard_ids(db, shard, 0)
+            db.commit()
+    last_id = 0
+    while True:
+        with engine.connect() as conn:
+            rows = (
+                conn.execute(
+                    select(ITEMS)
+                    .where(ITEMS.c.id > last_id)
+                    .order_by(ITEMS.c.id)
+                    .limit(batch_size)
+                )
+                .mappings()
+                .all()
+            )
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+
+        by_target: Dict[int, List[dict]] = defaultdict(list)
+        for row in rows:
+            target = shard_router.shard_for_owner(row["owner_id"])
+            if target != shard:
+                # Positions are per database: the target assigns new ones after the move
+                by_target[target].append({**row, "change_seq": None})
+        for target, batch in by_target.items():
+            moved[target] += len(batch)
+            if dry_run:
+                continue
+            with shard_router.engines[target].begin() as conn:
+                conn.execute(insert(ITEMS).prefix_with("OR IGNORE"), batch)
+            with engine.begin() as conn:
+                conn.execute(
+                    delete(ITEMS).where(ITEMS.c.id.in_([row["id"] for row in batch]))
+                )
+    for target, count in sorted(moved.items()):
+        print(f"{label}: {count} rows -> shard {target}")
+    return moved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--source-shards",
+        type=int,
+        default=0,
+        help="Number of shard files written under the previous ITEM_SHARDS setting.",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if not shard_router.enabled:
+        raise SystemExit("ITEM_SHARDS is 0: set the target shard count first.")
+
+    for engine in shard_router.engines:
+        SQLModel.metadata.create_all(engine, tables=SHARDED_TABLES)
+
+    sources = source_engines(args.source_shards)
+    for _, engine, _ in sources:
+        add_missing_columns(engine, ITEMS)
+    total = sum(
+        sum(rebalance_source(*source, args.batch_size, args.dry_run).values())
+        for source in sources
+    )
+    print(f"{'Would move' if args.dry_run else 'Moved'} {total} rows.")
+
+    if not args.dry_run:
+        for shard, engine in enumerate(shard_router.engines):
+            with Session(engine) as db:
+                assigned = item_change_repo.backfill(db)
+            print(f"shard {shard}: change feed positions assigned to {assigned} items.")
+        for label, engine, _ in sources:
+            if inspect(engine).has_table(SHARDED_TABLES[1].name):
+                with Session(engine) as db:
+                    fixed = item_stats_repo.reconcile(db)
+                print(f"{label}: item statistics reconciled, {fixed} owners corrected.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Shows the slowest traces recorded in TRACE_FILE as span trees.
+
+Each trace is printed as its root span (an HTTP request or a UI event handler) followed by
+the spans it caused, indented by nesting, with each span's start offset, duration and
+self time (its duration minus the time covered by its children), so the step that took the
+time stands out. --by-name adds a table of span names ranked by total self time across the
+shown traces.
+
+Run from the project root (settings are read from .env):
+
+    python -m scripts.show_traces --limit 5 --name update_item
+"""
+
+import argparse
+import json
+import statistics
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.core.config import settings
+
+# Attributes shown next to a span's name, in this order.
+SHOWN_ATTRIBUTES = ("http.status_code", "db.statement", "db.shard", "ui_db.wait_ms")
+
+
+def attribute_value(value: Dict[str, Any]) -> Any:
+    """Unwraps an OTLP/JSON AnyValue."""
+    for key in ("stringValue", "boolValue", "doubleValue"):
+        if key in value:
+            return value[key]
+    if "intValue" in value:
+        return int(value["intValue"])
+    return None
+
+
+def load_spans(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Reads the OTLP/JSON lines of the trace file and returns the spans by trace ID."""
+    traces: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    with open(path, encoding="utf-8") as lines:
+        for line in lines:
+            if not line.strip():
+                continue
+            for resource in json.loads(line)["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    for span in scope["spans"]:
+                        span["start"] = int(span["startTimeUnixNano"])
+                        span["duration"] = int(span["endTimeUnixNano"]) - span["start"]
+                        span["attributes"] = {
+                            attribute["key"]: attribute_value(attribute["value"])
+                            for attribute in span.get("attributes", [])
+                        }
+                        traces[span["traceId"]].append(span)
+    return traces
+
+
+def build_tree(spans: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Links the spans of one trace to their children and returns the root. Spans whose parent
+    was not recorded (dropped, or a remote caller) are treated as roots; the longest wins.
+    """
+    by_id = {span["spanId"]: span for span in spans}
+    roots = []
+    for span in spans:
+        span.setdefault("children", [])
+    for span in spans:
+        parent = by_id.get(span.get("parentSpanId", ""))
+        if parent is None:
+            roots.append(span)
+        else:
+            parent["children"].append(span)
+    for span in spans:
+        span["children"].sort(key=lambda child: child["start"])
+        span["self"] = span["duration"] - covered(span["children"])
+    return max(roots, key=lambda span: span["duration"], default=None)
+
+
+def covered(children: List[Dict[str, Any]]) -> int:
+    """Time covered by at least one of the children, which may run in parallel (sorted by start)."""
+    total, end = 0, 0
+    for child in children:
+        child_end = child["start"] + child["duration"]
+        if child_end > end:
+            total += child_end - max(child["start"], end)
+            end = child_end
+    return total
+
+
+def ms(nanoseconds: int) -> str:
+    return f"{nanoseconds / 1e6:9.2f}"
+
+
+def describe(span: Dict[str, Any]) -> str:
+    details = [
+        f"{key.split('.')[-1]}={' '.join(str(span['attributes'][key]).split())[:80]}"
+        for key in SHOWN_ATTRIBUTES
+        if key in span["attributes"]
+    ]
+    status = span.get("status", {})
+    if status.get("code") == 2:
+        details.append(f"ERROR {status.get('message', '')}".strip())
+    return " ".join([span["name"], *details])
+
+
+def print_tree(span: Dict[str, Any], root_start: int, depth: int = 0) -> None:
+    print(
+        f"{ms(span['start'] - root_start)} {ms(span['duration'])} {ms(span['self'])}"
+        f"  {'  ' * depth}{describe(span)}"
+    )
+    for child in span["children"]:
+        print_tree(child, root_start, depth + 1)
+
+
+def print_by_name(roots: List[Dict[str, Any]]) -> None:
+    self_times: Dict[str, List[int]] = defaultdict(list)
+
+    def collect(span: Dict[str, Any]) -> None:
+        self_times[span["name"]].append(span["self"])
+        for child in span["children"]:
+            collect(child)
+
+    for root in roots:
+        collect(root)
+    print(
+        f"{'total ms':>10} {'count':>7} {'median ms':>10} {'max ms':>9}  span (by self time)"
+    )
+    for name, times in sorted(self_times.items(), key=lambda entry: -sum(entry[1])):
+        print(
+            f"{sum(times) / 1e6:10.2f} {len(times):7d}"
+            f" {statistics.median(times) / 1e6:10.2f} {max(times) / 1e6:9.2f}  {name}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--file", default=settings.TRACE_FILE, help="Defaults to TRACE_FILE."
+    )
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument(
+        "--name", help="Only traces whose root span name contains this text."
+    )
+    parser.add_argument("--trace", help="Show only the trace with this ID.")
+    parser.add_argument(
+        "--by-name", action="store_true", help="Also rank span names by self time."
+    )
+    args = parser.parse_args()
+    if not args.file:
+        raise SystemExit("Set TRACE_FILE or pass --file.")
+
+    roots = []
+    for trace_id, spans in load_spans(args.file).items():
+        if args.trace and trace_id != args.trace:
+            continue
+        root = build_tree(spans)
+        if root is not None and (not args.name or args.name in root["name"]):
+            roots.append(root)
+    roots.sort(key=lambda span: span["duration"], reverse=True)
+    print(f"{len(roots)} traces\n")
+
+    for root in roots[: args.limit]:
+        started = datetime.fromtimestamp(root["start"] / 1e9).isoformat(
+            sep=" ", timespec="milliseconds"
+        )
+        print(f"trace {root['traceId']} at {started}")
+        print(f"{'start ms':>9} {'total ms':>9} {'self ms':>9}  span")
+        print_tree(root, root["start"])
+        print()
+    if args.by_name:
+        print_by_name(roots[: args.limit])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,505 @@
+"""
+Stress-tests concurrent item reads and writes through ItemRepository, to reproduce
+`database is locked` errors and tail latency under SQLite write contention.
+
+Every engine configuration (--configs) gets a fresh temporary database, seeded by
+scripts.generate_dataset, and is driven in a subprocess of its own, because settings and
+engines are fixed at import. Each configuration runs every mode (--modes) for --duration
+seconds with --workers concurrent workers:
+
+- threads: worker threads calling the repository directly, like API requests.
+- async: asyncio tasks going through the UI's bounded worker pool (ui_db), which also
+  reports event loop lag.
+- processes: worker processes, like several uvicorn workers on one database.
+
+Every operation uses its own session. Lock errors are retried up to --retries times with
+jittered backoff; an operation's latency includes its retries. Results, including lock
+errors, retries, failures and p50/p99/p999 latency per operation, are written to --report
+(Markdown) and next to it as JSON.
+
+Run from the project root (SECRET_KEY and the superuser settings are read from .env):
+
+    python -m scripts.stress_items --duration 10 --workers 16 --configs default,wal
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+# Engine configurations: SQLite pragmas applied to every new connection, plus settings
+# overrides for the run. pysqlite's own default busy timeout is 5 seconds.
+ENGINE_CONFIGS: Dict[str, Dict[str, Any]] = {
+    "default": {"pragmas": {}},
+    "no-wait": {"pragmas": {"busy_timeout": 0}},
+    "wal": {"pragmas": {"journal_mode": "WAL", "synchronous": "NORMAL"}},
+    "wal-busy30": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 30000,
+        }
+    },
+    "wal-sharded4": {
+        "pragmas": {"journal_mode": "WAL", "synchronous": "NORMAL"},
+        "env": {"ITEM_SHARDS": "4"},
+    },
+}
+
+MODES = ("threads", "async", "processes")
+OPERATIONS = ("read", "create", "update", "delete")
+
+
+@dataclass
+class Stats:
+    """Latencies and outcome counters of one mode's run, mergeable across workers."""
+
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    lock_errors: int = 0
+    retries: int = 0
+    failures: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def merge(self, other: "Stats") -> None:
+        for op, values in other.latencies.items():
+            self.latencies[op].extend(values)
+        self.lock_errors += other.lock_errors
+        self.retries += other.retries
+        for reason, count in other.failures.items():
+            self.failures[reason] += count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "latencies": dict(self.latencies),
+            "lock_errors": self.lock_errors,
+            "retries": self.retries,
+            "failures": dict(self.failures),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Stats":
+        stats = cls(lock_errors=data["lock_errors"], retries=data["retries"])
+        for op, values in data["latencies"].items():
+            stats.latencies[op].extend(values)
+        for reason, count in data["failures"].items():
+            stats.failures[reason] += count
+        return stats
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def summarize(stats: Stats, duration: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles (ms) per operation and overall."""
+
+    def describe(values: List[float]) -> Dict[str, float]:
+        ordered = sorted(values)
+        return {
+            "ops": len(ordered),
+            "p50_ms": round(percentile(ordered, 0.5) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "p999_ms": round(percentile(ordered, 0.999) * 1000, 2),
+            "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 2),
+        }
+
+    everything = [value for values in stats.latencies.values() for value in values]
+    return {
+        "ops_per_second": round(len(everything) / duration, 1),
+        "overall": describe(everything),
+        "operations": {
+            op: describe(stats.latencies[op])
+            for op in OPERATIONS
+            if stats.latencies.get(op)
+        },
+        "lock_errors": stats.lock_errors,
+        "retries": stats.retries,
+        "failures": dict(stats.failures),
+    }
+
+
+# --- Driver side: runs inside a configuration's subprocess -------------------------------
+
+
+def apply_engine_config(name: str) -> None:
+    """Applies the configuration's pragmas to every SQLite connection this process opens."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    pragmas = ENGINE_CONFIGS[name]["pragmas"]
+
+    @event.listens_for(Engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
+
+
+def is_lock_error(exc: BaseException) -> bool:
+    """True if the exception, or one it was raised from, is SQLite reporting a lock."""
+    from sqlalchemy.exc import OperationalError
+
+    while exc is not None:
+        if isinstance(exc, OperationalError) and "locked" in str(exc):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+class Workload:
+    """
+    Picks operations by --mix weights for one worker. Updates and deletes only touch items
+    in the worker's own pool (its share of the seeded items plus what it created), so
+    workers never race each other for the same row and every failure is a real one.
+    """
+
+    def __init__(self, args: argparse.Namespace, index: int, seed_items, users) -> None:
+        self.args = args
+        self.rng = random.Random(f"{args.seed}:{index}")
+        self.users = users
+        self.pool: List[Tuple[int, int]] = [
+            item for n, item in enumerate(seed_items) if n % args.workers == index
+        ]
+        weights = dict(part.split("=") for part in args.mix.split(","))
+        self.ops = [op for op in OPERATIONS if op in weights]
+        self.weights = [float(weights[op]) for op in self.ops]
+
+    def next_operation(self) -> Tuple[str, Callable[[], None]]:
+        from src.db.session import get_db_context
+        from src.models import ItemCreate, ItemUpdate
+        from src.repositories.item import item_repo
+
+        op = self.rng.choices(self.ops, self.weights)[0]
+        if op in ("update", "delete") and not self.pool:
+            op = "create"
+        if op == "read":
+            user = self.users[self.rng.choice(list(self.users))]
+
+            def run() -> None:
+                with get_db_context() as db:
+                    item_repo.get_rows_for_user(db, current_user=user)
+
+        elif op == "create":
+            user = self.users[self.rng.choice(list(self.users))]
+
+            def run() -> None:
+                with get_db_context() as db:
+                    item = item_repo.create_for_user(
+                        db,
+                        obj_in=ItemCreate(title=f"stress {uuid.uuid4().hex}"),
+                        current_user=user,
+                    )
+                self.pool.append((item.id, user.id))
+
+        elif op == "update":
+            item_id, owner_id = self.rng.choice(self.pool)
+
+            def run() -> None:
+                with get_db_context() as db:
+                    item_repo.update_for_user(
+                        db,
+                        item_id=item_id,
+                        obj_in=ItemUpdate(description=f"updated {time.time()}"),
+                        current_user=self.users[owner_id],
+                    )
+
+        else:
+            position = self.rng.randrange(len(self.pool))
+            item_id, owner_id = self.pool[position]
+            self.pool[position] = self.pool[-1]
+            self.pool.pop()
+
+            def run() -> None:
+                with get_db_context() as db:
+                    item_repo.delete_for_user(
+                        db, item_id=item_id, current_user=self.users[owner_id]
+                    )
+
+        return op, run
+
+
+def run_with_retries(
+    args: argparse.Namespace, op: str, run: Callable[[], None], stats: Stats, rng
+) -> None:
+    """Runs one operation, retrying lock errors with jittered exponential backoff."""
+    start = time.perf_counter()
+    for attempt in range(args.retries + 1):
+        try:
+            run()
+        except Exception as e:
+            if is_lock_error(e):
+                stats.lock_errors += 1
+                if attempt < args.retries:
+                    stats.retries += 1
+                    time.sleep(rng.uniform(0, min(0.005 * 2**attempt, 0.5)))
+                    continue
+                stats.failures["locked"] += 1
+            else:
+                stats.failures[getattr(e, "status_code", type(e).__name__)] += 1
+            return
+        stats.latencies[op].append(time.perf_counter() - start)
+        return
+
+
+def load_fixtures(args: argparse.Namespace):
+    """Loads the synthetic users and the (item ID, owner ID) pairs of their items."""
+    from sqlmodel import Session, select
+
+    from src.db.session import engine
+    from src.db.shards import shard_router
+    from src.models import Item, User
+
+    with Session(engine) as db:
+        users = {
+            user.id: user
+            for user in db.exec(select(User).where(User.is_superuser.is_(False))).all()
+        }
+    query = select(Item.id, Item.owner_id).order_by(Item.id)
+    if shard_router.enabled:
+        parts = shard_router.scatter(lambda session: session.exec(query).all())
+        items = [tuple(row) for part in parts for row in part]
+    else:
+        with Session(engine) as db:
+            items = [tuple(row) for row in db.exec(query).all()]
+    return items, users
+
+
+def worker_loop(args, index: int, deadline: float, seed_items, users) -> Stats:
+    stats = Stats()
+    workload = Workload(args, index, seed_items, users)
+    while time.perf_counter() < deadline:
+        op, run = workload.next_operation()
+        run_with_retries(args, op, run, stats, workload.rng)
+    return stats
+
+
+def run_threads(args: argparse.Namespace, seed_items, users) -> Tuple[Stats, Dict]:
+    deadline = time.perf_counter() + args.duration
+    stats = Stats()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(worker_loop, args, index, deadline, seed_items, users)
+            for index in range(args.workers)
+        ]
+        for future in futures:
+            stats.merge(future.result())
+    return stats, {}
+
+
+def run_async(args: argparse.Namespace, seed_items, users) -> Tuple[Stats, Dict]:
+    from src.frontend.data_access import loop_lag, ui_db
+
+    async def task(index: int, deadline: float) -> Stats:
+        stats = Stats()
+        workload = Workload(args, index, seed_items, users)
+        while time.perf_counter() < deadline:
+            op, run = workload.next_operation()
+            await ui_db.run(run_with_retries, args, op, run, stats, workload.rng)
+        return stats
+
+    async def main() -> Stats:
+        monitor = asyncio.create_task(loop_lag.run_periodically())
+        deadline = time.perf_counter() + args.duration
+        results = await asyncio.gather(
+            *(task(index, deadline) for index in range(args.workers))
+        )
+        monitor.cancel()
+        stats = Stats()
+        for result in results:
+            stats.merge(result)
+        return stats
+
+    stats = asyncio.run(main())
+    ui_db.shutdown()
+    return stats, {"loop_lag": loop_lag.stats(), "ui_db": ui_db.stats()}
+
+
+_start_barrier = None
+
+
+def init_process(barrier) -> None:
+    global _start_barrier
+    _start_barrier = barrier
+
+
+def process_entry(payload: Tuple[argparse.Namespace, int]) -> Dict[str, Any]:
+    args, index = payload
+    apply_engine_config(args.config)
+    seed_items, users = load_fixtures(args)
+    # Start together, so one process's startup does not overlap another's measured window
+    _start_barrier.wait()
+    deadline = time.perf_counter() + args.duration
+    return worker_loop(args, index, deadline, seed_items, users).to_dict()
+
+
+def run_processes(args: argparse.Namespace, seed_items, users) -> Tuple[Stats, Dict]:
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.workers)
+    stats = Stats()
+    with context.Pool(args.workers, init_process, (barrier,)) as pool:
+        payloads = [(args, index) for index in range(args.workers)]
+        for result in pool.map(process_entry, payloads, chunksize=1):
+            stats.merge(Stats.from_dict(result))
+    return stats, {}
+
+
+def drive(args: argparse.Namespace) -> None:
+    """Runs every mode against this process's database and prints the results as JSON."""
+    apply_engine_config(args.config)
+    from src.db import init_db
+
+    init_db.init()
+    runners = {"threads": run_threads, "async": run_async, "processes": run_processes}
+    results = {}
+    for mode in args.modes.split(","):
+        seed_items, users = load_fixtures(args)
+        stats, extra = runners[mode](args, seed_items, users)
+        results[mode] = {**summarize(stats, args.duration), **extra}
+        print(f"  {mode}: {results[mode]['ops_per_second']} ops/s", file=sys.stderr)
+    print(json.dumps(results))
+
+
+# --- Orchestrator side ---------------------------------------------------------------
+
+
+def run_config(args: argparse.Namespace, name: str) -> Dict[str, Any]:
+    """Seeds a fresh database for one configuration and drives it in a subprocess."""
+    directory = tempfile.mkdtemp(prefix=f"stress-{name}-")
+    try:
+        return _seed_and_drive(args, name, directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _seed_and_drive(
+    args: argparse.Namespace, name: str, directory: str
+) -> Dict[str, Any]:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{directory}/app.db",
+        "ITEM_SHARD_URL": f"sqlite:///{directory}/items_{{shard}}.db",
+        "ITEM_SHARDS": "0",
+        "ITEM_CACHE_MAX_ROWS": "50000" if args.cache else "0",
+        "ITEM_CACHE_SYNC_INTERVAL": "0",
+        "LOG_LEVEL": "WARNING",
+        **ENGINE_CONFIGS[name].get("env", {}),
+    }
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "scripts.generate_dataset",
+            f"--users={args.users}",
+            f"--items={args.items}",
+            f"--seed={args.seed}",
+        ],
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    forwarded = [
+        f"--{key.replace('_', '-')}={value}"
+        for key, value in vars(args).items()
+        if key not in ("configs", "report", "cache", "config") and value is not None
+    ]
+    if args.cache:
+        forwarded.append("--cache")
+    output = subprocess.run(
+        [sys.executable, "-m", "scripts.stress_items", f"--config={name}", *forwarded],
+        env=env,
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def write_report(args: argparse.Namespace, results: Dict[str, Dict[str, Any]]) -> None:
+    lines = [
+        "# Item repository stress report",
+        "",
+        f"{args.workers} workers, {args.duration:g} s per mode, mix {args.mix},"
+        f" {args.users} users and {args.items} seeded items, up to {args.retries} retries"
+        f" per operation, item list cache {'on' if args.cache else 'off'}.",
+        "",
+        "| config | mode | ops/s | p50 ms | p99 ms | p999 ms | max ms"
+        " | lock errors | retries | failed |",
+        "|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for name, modes in results.items():
+        for mode, result in modes.items():
+            overall = result["overall"]
+            failed = ", ".join(
+                f"{reason}: {count}" for reason, count in result["failures"].items()
+            )
+            lines.append(
+                f"| {name} | {mode} | {result['ops_per_second']} | {overall['p50_ms']}"
+                f" | {overall['p99_ms']} | {overall['p999_ms']} | {overall['max_ms']}"
+                f" | {result['lock_errors']} | {result['retries']} | {failed or 0} |"
+            )
+    lines += ["", "Per-operation latencies and loop lag are in the JSON report."]
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as report:
+        report.write("\n".join(lines) + "\n")
+    with open(os.path.splitext(args.report)[0] + ".json", "w", encoding="utf-8") as raw:
+        json.dump(results, raw, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--configs", default=",".join(ENGINE_CONFIGS))
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument(
+        "--mix",
+        default="read=60,create=20,update=15,delete=5",
+        help="Relative weights of the operations.",
+    )
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Keep the item list cache on (it is off so reads reach the database).",
+    )
+    parser.add_argument("--report", default="stress-report.md")
+    parser.add_argument("--config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.config:
+        drive(args)
+        return
+
+    results = {}
+    for name in args.configs.split(","):
+        if name not in ENGINE_CONFIGS:
+            raise SystemExit(
+                f"Unknown config {name!r}; choose from {list(ENGINE_CONFIGS)}."
+            )
+        print(f"{name}:", file=sys.stderr)
+        results[name] = run_config(args, name)
+    write_report(args, results)
+    with open(args.report, encoding="utf-8") as report:
+        print(report.read())
+
+
+if __name__ == "__main__":
+    main()
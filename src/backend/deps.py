@@ -6,21 +6,24 @@ from sqlmodel import Session
 
 from src.core import security
 from src.core.config import settings
+from src.core.tracing import traced, tracer
 from src.db.session import get_db
 from src.models import models
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl="/login/access-token")
 
 
+@traced("auth.get_user_from_token")
 def get_user_from_token(db: Session, token: str) -> models.User:
     """
     Decodes a JWT token and returns the corresponding user from the database.
     This function does NOT use Depends() and can be called from anywhere.
     """
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
+        with tracer.span("auth.decode_jwt"):
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+            )
         token_data = payload.get("sub")
     except (JWTError, ValidationError):
         raise HTTPException(
@@ -0,0 +1,90 @@
+from typing import Any, Dict, Union
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+from src.backend import deps
+from src.core.config import settings
+from src.core.logs import logging_pipeline
+from src.core.profiling import profiler
+from src.core.tracing import tracer
+from src.frontend.client_monitor import client_monitor
+from src.frontend.data_access import loop_lag, ui_db
+from src.models import User
+from src.repositories.item_cache import item_list_cache
+from src.repositories.item_titles import item_title_filter
+from src.services.idempotency import idempotency_store
+
+router = APIRouter()
+
+
+@router.get("/logging")
+def read_logging_stats(
+    _current_user: User = Depends(deps.get_current_active_superuser),
+) -> Dict[str, int]:
+    """Reports the logging queue's backpressure counters, restricted to superusers."""
+    return logging_pipeline.stats()
+
+
+@router.get("/tracing")
+def read_tracing_stats(
+    _current_user: User = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """Reports how many spans were exported and dropped, restricted to superusers."""
+    return tracer.stats()
+
+
+@router.get("/clients")
+def read_client_usage(
+    _current_user: User = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """Reports estimated UI memory per connected client and in total, restricted to superusers."""
+    return {"summary": client_monitor.stats(), "clients": client_monitor.usage()}
+
+
+@router.get("/ui")
+def read_ui_latency(
+    _current_user: User = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """Reports event loop lag and the UI database worker pool's load, restricted to superusers."""
+    return {"loop_lag": loop_lag.stats(), "db_workers": ui_db.stats()}
+
+
+@router.get("/item-cache")
+def read_item_cache_stats(
+    _current_user: User = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """Reports the item list cache's size, hit rate and eviction counters, restricted to superusers."""
+    return item_list_cache.stats()
+
+
+@router.get("/item-titles")
+def read_item_title_filter_stats(
+    _current_user: User = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """Reports the title filters' memory, skipped queries and false-positive counters, restricted to superusers."""
+    return item_title_filter.stats()
+
+
+@router.get("/idempotency")
+def read_idempotency_stats(
+    _current_user: User = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """Reports stored idempotency keys, replays and coalesced retries, restricted to superusers."""
+    return idempotency_store.stats()
+
+
+@router.get("/profile", response_model=None)
+def capture_profile(
+    seconds: float = Query(default=5, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    idle: bool = Query(default=False),
+    format: str = Query(default="json", pattern="^(json|collapsed)$"),
+    _current_user: User = Depends(deps.get_current_active_superuser),
+) -> Union[Dict[str, Any], PlainTextResponse]:
+    """
+    Samples the stacks of the event loop and every worker thread for `seconds` and reports
+    the hottest functions and the collapsed stacks (`format=collapsed` returns only those,
+    ready for flamegraph.pl or speedscope). One capture runs at a time, restricted to superusers.
+    """
+    profile = profiler.capture(seconds, include_idle=idle)
+    if format == "collapsed":
+        return PlainTextResponse(profile["collapsed"] + "\n")
+    return profile
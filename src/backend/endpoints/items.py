@@ -1,20 +1,127 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    Header,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
 from sqlmodel import Session
-from src.models import Item, ItemRead, ItemCreate, ItemUpdate, User
+from src.models import (
+    Item,
+    ItemRead,
+    ItemCreate,
+    ItemUpdate,
+    ItemStatsRead,
+    ItemChangesPage,
+    ImportJobRead,
+    User,
+)
 from src.backend import deps
+from src.backend.responses import fast_json_response
 from src.repositories.item import item_repo
+from src.repositories.item_changes import item_change_repo
+from src.repositories.item_stats import item_stats_repo
+from src.services.idempotency import (
+    fingerprint,
+    fingerprint_upload,
+    idempotency_store,
+)
+from src.services.imports import detect_format, import_jobs, spool_upload
+from src.services.item_import import run_item_import
 
 router = APIRouter()
 
 
 @router.get("/items/", response_model=List[ItemRead])
 def read_items(
+    request: Request,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
-) -> List[Item]:
-    """Retrieves items for the current user."""
-    return item_repo.get_for_user(db=db, current_user=current_user)
+) -> Response:
+    """Retrieves items for the current user.
+    Rows are selected as plain ItemRead columns and encoded directly, so the
+    response_model is only used for the OpenAPI schema."""
+    rows = item_repo.get_rows_for_user(db=db, current_user=current_user)
+    return fast_json_response(rows, request)
+
+
+@router.get("/items/stats", response_model=List[ItemStatsRead])
+def read_item_stats(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+    skip: int = 0,
+    limit: int = 100,
+) -> List[ItemStatsRead]:
+    """Retrieves the item statistics of the current user, or of all owners for a superuser."""
+    return item_stats_repo.get_for_user(
+        db=db, current_user=current_user, skip=skip, limit=limit
+    )
+
+
+@router.get("/items/changes", response_model=ItemChangesPage)
+def read_item_changes(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+    since: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+) -> ItemChangesPage:
+    """Retrieves the item inserts, updates and deletes since the cursor `since`, in pages.
+    Start without a cursor for a full sync, then pass back the returned cursor until has_more is False.
+    A 410 response means the cursor is no longer valid and a full sync is needed."""
+    return item_change_repo.get_changes_for_user(
+        db=db, current_user=current_user, since=since, limit=limit
+    )
+
+
+@router.post("/items/import", response_model=ImportJobRead, status_code=202)
+def import_items(
+    *,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user: User = Depends(deps.get_current_user),
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+) -> ImportJobRead:
+    """Starts a background import of items from a CSV or NDJSON file (title, description).
+    Poll the returned job for progress and the per-row error report.
+    A retry with the same Idempotency-Key and file gets the original job back."""
+
+    def start_import() -> ImportJobRead:
+        fmt = detect_format(file.filename)
+        path, size = spool_upload(file.file)
+        job = import_jobs.create(
+            kind="items",
+            owner_id=current_user.id,
+            filename=file.filename,
+            total_bytes=size,
+        )
+        background_tasks.add_task(run_item_import, job.id, path, fmt)
+        return ImportJobRead.model_validate(job, from_attributes=True)
+
+    return idempotency_store.run(
+        key=idempotency_key,
+        scope="items.import",
+        user_id=current_user.id,
+        request_fingerprint=fingerprint_upload(file.filename, file.file)
+        if idempotency_key
+        else "",
+        call=start_import,
+        status_code=202,
+    )
+
+
+@router.get("/items/import/{job_id}", response_model=ImportJobRead)
+def read_import_job(
+    job_id: str,
+    current_user: User = Depends(deps.get_current_user),
+) -> ImportJobRead:
+    """Reports the progress and per-row errors of an item import job."""
+    job = import_jobs.get_for_user(job_id, current_user=current_user)
+    return ImportJobRead.model_validate(job, from_attributes=True)
 
 
 @router.post("/item/", response_model=ItemRead)
@@ -23,9 +130,20 @@ def create_item(
     db: Session = Depends(deps.get_db),
     item_in: ItemCreate,
     current_user: User = Depends(deps.get_current_user),
-) -> Item:
-    """Creates a new item for the current user."""
-    return item_repo.create_for_user(db=db, obj_in=item_in, current_user=current_user)
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+) -> ItemRead:
+    """Creates a new item for the current user.
+    A retry with the same Idempotency-Key and body gets the original response back."""
+    return idempotency_store.run(
+        key=idempotency_key,
+        scope="items.create",
+        user_id=current_user.id,
+        request_fingerprint=fingerprint(item_in.model_dump_json().encode()),
+        call=lambda: ItemRead.model_validate(
+            item_repo.create_for_user(db=db, obj_in=item_in, current_user=current_user),
+            from_attributes=True,
+        ),
+    )
 
 
 @router.put("/item/{item_id}", response_model=ItemRead)
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
+from fastapi.responses import FileResponse
 from sqlmodel import Session
-from src.models import UserCreate, UserRead, User
+from src.models import ImportJobRead, UserCreate, UserRead, User
 from src.backend import deps
 from src.repositories.user import user_repo
+from src.services.imports import ImportJob, detect_format, import_jobs, spool_upload
+from src.services.user_import import run_user_import
 
 router = APIRouter()
 
@@ -19,3 +22,56 @@ def create_user(
     """Creates a new user, a function restricted to superusers,
     and prevents the creation of users with duplicate email addresses."""
     return user_repo.register(db=db, obj_in=user_in)
+
+
+@router.post("/users/import", response_model=ImportJobRead, status_code=202)
+def import_users(
+    *,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> ImportJobRead:
+    """Starts a background import of users from a CSV or NDJSON file (email, password,
+    and optionally full_name, is_active, is_superuser), a function restricted to superusers.
+    Poll the returned job for progress, then download the per-row results."""
+    fmt = detect_format(file.filename)
+    path, size = spool_upload(file.file)
+    job = import_jobs.create(
+        kind="users", owner_id=current_user.id, filename=file.filename, total_bytes=size
+    )
+    background_tasks.add_task(run_user_import, job.id, path, fmt)
+    return ImportJobRead.model_validate(job, from_attributes=True)
+
+
+@router.get("/users/import/{job_id}", response_model=ImportJobRead)
+def read_user_import_job(
+    job_id: str,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> ImportJobRead:
+    """Reports the progress and per-row errors of a user import job."""
+    job = _get_user_import_job(job_id, current_user)
+    return ImportJobRead.model_validate(job, from_attributes=True)
+
+
+@router.get("/users/import/{job_id}/results", response_class=FileResponse)
+def read_user_import_results(
+    job_id: str,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> FileResponse:
+    """Downloads the outcome of every row of a finished user import as CSV
+    (row, email, status, user_id, error). Passwords are never included."""
+    job = _get_user_import_job(job_id, current_user)
+    if job.status not in ("completed", "failed") or not job.result_path:
+        raise HTTPException(status_code=409, detail="The import has not finished yet.")
+    return FileResponse(
+        job.result_path,
+        media_type="text/csv",
+        filename=f"{job.filename}.results.csv",
+    )
+
+
+def _get_user_import_job(job_id: str, current_user: User) -> ImportJob:
+    job = import_jobs.get_for_user(job_id, current_user=current_user)
+    if job.kind != "users":
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
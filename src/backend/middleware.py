@@ -0,0 +1,113 @@
+import logging
+import re
+import time
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import settings
+from src.core.logs import request_id_var, sampled
+from src.core.tracing import SERVER, STATUS_ERROR, tracer
+
+access_logger = logging.getLogger("app.access")
+
+# W3C trace context header: version-trace_id-parent_id-flags
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class RequestLoggingMiddleware:
+    """
+    Gives every HTTP request a correlation ID (taken from an incoming X-Request-ID header
+    or generated) that is attached to all records logged while handling it and echoed in
+    the response. A sampled access line is logged per request; server errors always are.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = (
+            Headers(scope=scope).get("x-request-id", "")[:64] or uuid.uuid4().hex
+        )
+        token = request_id_var.set(request_id)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if status_code >= 500 or sampled(settings.LOG_ACCESS_SAMPLE_RATE):
+                access_logger.info(
+                    "%s %s %s",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                    },
+                )
+            request_id_var.reset(token)
+
+
+class TracingMiddleware:
+    """
+    Runs every HTTP request, except NiceGUI's static assets, in a root span named after
+    the matched route once routing is done. A W3C `traceparent` header continues the
+    caller's trace instead of starting one. Add it inside RequestLoggingMiddleware, so
+    spans carry the request ID.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not tracer.enabled
+            or scope["path"].startswith("/_nicegui/")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        remote = _TRACEPARENT.match(Headers(scope=scope).get("traceparent", ""))
+        with tracer.span(
+            f"{scope['method']} {scope['path']}",
+            kind=SERVER,
+            trace_id=remote.group(1) if remote else None,
+            parent_id=remote.group(2) if remote else None,
+            **{
+                "http.method": scope["method"],
+                "http.target": scope["path"],
+                "request_id": request_id_var.get() or "",
+            },
+        ) as span:
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = STATUS_ERROR
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if route is not None and getattr(route, "path", None):
+                    span.name = f"{scope['method']} {route.path}"
+                    span.set_attribute("http.route", route.path)
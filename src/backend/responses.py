@@ -0,0 +1,48 @@
+import gzip
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+
+from src.core.config import settings
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip: listed with a non-zero q-value, or
+    covered by a non-zero `*` when gzip is not listed. `gzip;q=0` refuses it.
+    """
+    qualities = {}
+    for entry in accept_encoding.lower().split(","):
+        coding, _, params = entry.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip()] = quality
+    if "gzip" in qualities:
+        return qualities["gzip"] > 0
+    return qualities.get("*", 0.0) > 0
+
+
+def fast_json_response(content: Any, request: Request) -> Response:
+    """
+    Encodes already-serializable content (dicts, lists, scalars) with orjson,
+    skipping FastAPI's response_model validation and jsonable_encoder pass.
+    Bodies at or above FAST_JSON_GZIP_MIN_SIZE are gzip-compressed when the client accepts it.
+    """
+    body = orjson.dumps(content)
+    headers = {}
+    min_size = settings.FAST_JSON_GZIP_MIN_SIZE
+    if (
+        min_size is not None
+        and len(body) >= min_size
+        and accepts_gzip(request.headers.get("accept-encoding", ""))
+    ):
+        body = gzip.compress(body, compresslevel=settings.FAST_JSON_GZIP_LEVEL)
+        headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+    return Response(content=body, media_type="application/json", headers=headers)
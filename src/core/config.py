@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import EmailStr
 from pydantic_settings import BaseSettings
 
@@ -8,6 +9,73 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./data/app.db"
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
+    # Responses from the fast JSON path are gzip-compressed at or above this size
+    # (in bytes). Unset leaves them uncompressed.
+    FAST_JSON_GZIP_MIN_SIZE: Optional[int] = None
+    FAST_JSON_GZIP_LEVEL: int = 6
+    ITEM_IMPORT_CHUNK_SIZE: int = 500
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000
+    IMPORT_MAX_JOBS: int = 100
+    USER_IMPORT_CHUNK_SIZE: int = 200
+    # Responses to requests with an Idempotency-Key are replayed to retries for this many
+    # seconds. IDEMPOTENCY_PERSIST also stores them in the database, for other processes.
+    IDEMPOTENCY_TTL_SECONDS: float = 24 * 60 * 60
+    IDEMPOTENCY_MAX_KEYS: int = 10000
+    IDEMPOTENCY_PERSIST: bool = False
+    # How long a retry waits for the original request that is still running, before a 409.
+    # The wait holds a worker thread, so keep it short; 0 answers 409 at once.
+    IDEMPOTENCY_WAIT_SECONDS: float = 5
+    # Processes that hash passwords for bulk user imports; unset uses one per CPU.
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    # Seconds between item statistics reconciliation runs; 0 reconciles only at startup.
+    ITEM_STATS_RECONCILE_INTERVAL: float = 3600
+    # Days tombstones of deleted items stay in the change feed; change cursors older than
+    # the pruned ones get a 410. 0 keeps them forever. Pruning runs every interval seconds.
+    ITEM_TOMBSTONE_RETENTION_DAYS: float = 30
+    ITEM_TOMBSTONE_PRUNE_INTERVAL: float = 3600
+    # Number of database files item rows are spread across by owner;
+    # 0 keeps items in DATABASE_URL. Run scripts.rebalance_item_shards after changing it.
+    ITEM_SHARDS: int = 0
+    ITEM_SHARD_URL: str = "sqlite:///./data/items_{shard}.db"
+    # Total item rows kept in the per-owner item list cache; 0 disables the cache.
+    ITEM_CACHE_MAX_ROWS: int = 50000
+    # Seconds between polls for item list invalidations from other processes. Set it when
+    # running several workers; 0 keeps invalidations within the process.
+    ITEM_CACHE_SYNC_INTERVAL: float = 0
+    # Memory for per-owner title filters that let creates skip the duplicate-title
+    # query for titles that are definitely new; 0 disables them.
+    ITEM_TITLE_FILTER_MAX_BYTES: int = 8 * 1024 * 1024
+    LOG_LEVEL: str = "INFO"
+    # JSON lines go to this file, or to stdout when unset.
+    LOG_FILE: Optional[str] = None
+    LOG_QUEUE_SIZE: int = 10000
+    # Fraction of SQL statements and HTTP requests that are logged (0.0 to 1.0).
+    LOG_SQL_SAMPLE_RATE: float = 0.0
+    LOG_ACCESS_SAMPLE_RATE: float = 1.0
+    # Spans are written to this file as OTLP/JSON lines; tracing is off when unset.
+    TRACE_FILE: Optional[str] = None
+    # Fraction of traces (HTTP requests, UI events) that are recorded (0.0 to 1.0).
+    TRACE_SAMPLE_RATE: float = 1.0
+    TRACE_QUEUE_SIZE: int = 10000
+    TRACE_SERVICE_NAME: str = "nicegui-fastapi-template"
+    # Stack sampling of /debug/profile: the interval (ms) between samples, the longest
+    # capture, and the share of wall time sampling may use before it samples less often.
+    PROFILE_INTERVAL_MS: float = 10
+    PROFILE_MAX_SECONDS: float = 60
+    PROFILE_MAX_OVERHEAD: float = 0.05
+    PROFILE_TOP_N: int = 30
+    # NiceGUI pages idle for this many seconds release their content (0 disables).
+    CLIENT_IDLE_TIMEOUT: float = 600
+    CLIENT_SWEEP_INTERVAL: float = 30
+    # Rough server-side memory per UI element, used to estimate per-client memory.
+    CLIENT_ELEMENT_BYTES: int = 4096
+    CLIENT_MAX_BYTES: int = 16 * 1024 * 1024
+    CLIENT_MAX_TOTAL_BYTES: int = 512 * 1024 * 1024
+    # Worker threads that run the UI's database calls off the event loop.
+    UI_DB_WORKERS: int = 8
+    # Seconds between event loop lag probes, and the lag (ms) that is logged as a stall.
+    LOOP_LAG_INTERVAL: float = 0.5
+    LOOP_LAG_WARN_MS: float = 100
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,159 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.core.config import settings
+
+# Correlation ID of the request being handled, attached to every record logged while handling it.
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+sql_logger = logging.getLogger("app.sql")
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is logged as a field.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line, including fields passed through `extra=`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            payload["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a bounded queue without ever waiting on it. When the writer thread
+    falls behind and the queue is full, records are dropped and counted instead.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.max_depth = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Captures what must be resolved on the calling thread; formatting is left to the writer."""
+        record = copy.copy(record)
+        record.request_id = request_id_var.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+
+class LoggingPipeline:
+    """Routes all application logging through a queue drained by one background writer thread."""
+
+    def __init__(self) -> None:
+        self.handler: Optional[NonBlockingQueueHandler] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
+
+    def start(self) -> None:
+        """Installs the queue handler on the root logger and starts the writer thread."""
+        if self.listener is not None:
+            return
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(
+            maxsize=settings.LOG_QUEUE_SIZE
+        )
+        output = (
+            logging.FileHandler(settings.LOG_FILE, encoding="utf-8")
+            if settings.LOG_FILE
+            else logging.StreamHandler(sys.stdout)
+        )
+        output.setFormatter(JsonFormatter())
+        self.handler = NonBlockingQueueHandler(log_queue)
+        self.listener = logging.handlers.QueueListener(
+            log_queue, output, respect_handler_level=True
+        )
+
+        root = logging.getLogger()
+        root.handlers = [self.handler]
+        root.setLevel(settings.LOG_LEVEL)
+        if settings.LOG_SQL_SAMPLE_RATE > 0:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Flushes queued records and stops the writer thread."""
+        if self.listener is None:
+            return
+        self.listener.stop()
+        self.listener = None
+
+    def stats(self) -> Dict[str, int]:
+        """Backpressure counters of the queue between producers and the writer thread."""
+        if self.handler is None:
+            return {"depth": 0, "max_depth": 0, "capacity": 0, "dropped": 0}
+        return {
+            "depth": self.handler.queue.qsize(),
+            "max_depth": self.handler.max_depth,
+            "capacity": self.handler.queue.maxsize,
+            "dropped": self.handler.dropped,
+        }
+
+
+def sampled(rate: float) -> bool:
+    """Returns True for roughly `rate` of calls (1.0 keeps everything, 0.0 nothing)."""
+    return rate >= 1.0 or random.random() < rate
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and sampled(settings.LOG_SQL_SAMPLE_RATE):
+        context._log_sql_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_log_sql_start", None)
+    if start is None:
+        return
+    sql_logger.info(
+        "sql",
+        extra={
+            "statement": statement[:500],
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+            "executemany": executemany,
+        },
+    )
+
+
+logging_pipeline = LoggingPipeline()
@@ -0,0 +1,168 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from src.core.config import settings
+
+# Frames kept per stack, counted from the thread's entry point.
+_MAX_DEPTH = 128
+
+# Leaf frames of a thread that is waiting for work: an idle event loop, pool worker or timer.
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+def _thread_group(name: str) -> str:
+    """Groups numbered pool threads ('ui-db_3', 'Thread-7') under one name."""
+    return re.sub(r"[-_ ]?\(?\d+\)?$", "", name) or name
+
+
+def _frame_label(code) -> str:
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler of every thread in the process, including the event loop's.
+    It snapshots all Python stacks every PROFILE_INTERVAL_MS from the thread that runs the
+    capture, without tracing hooks, so unsampled code runs at full speed. When snapshots
+    get expensive (many threads, deep stacks), the interval is stretched to keep the
+    capture's own CPU time under PROFILE_MAX_OVERHEAD of the wall time.
+    Only one capture runs at a time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def capture(self, seconds: float, *, include_idle: bool = False) -> Dict[str, Any]:
+        """
+        Samples for `seconds` and returns the aggregated stacks. Raises 409 while another
+        capture is running. Samples of threads waiting for work are counted but dropped
+        unless `include_idle`.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise HTTPException(
+                status_code=409, detail="A profile is already being captured."
+            )
+        try:
+            return self._capture(seconds, include_idle)
+        finally:
+            self._lock.release()
+
+    def _capture(self, seconds: float, include_idle: bool) -> Dict[str, Any]:
+        own_id = threading.get_ident()
+        interval = settings.PROFILE_INTERVAL_MS / 1000
+        budget = settings.PROFILE_MAX_OVERHEAD
+        stacks: Counter = Counter()
+        rounds = idle = 0
+        sampling_time = 0.0
+        labels: Dict[Any, str] = {}
+
+        started = time.perf_counter()
+        deadline = started + seconds
+        while True:
+            sample_start = time.perf_counter()
+            if sample_start >= deadline:
+                break
+            names = {
+                thread.ident: _thread_group(thread.name)
+                for thread in threading.enumerate()
+            }
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                leaf = frame.f_code
+                if (
+                    os.path.basename(leaf.co_filename),
+                    leaf.co_name,
+                ) in _IDLE_LEAVES:
+                    idle += 1
+                    if not include_idle:
+                        continue
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                codes = codes[-_MAX_DEPTH:]
+                stack = [names.get(thread_id, f"thread-{thread_id}")]
+                for code in reversed(codes):
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    stack.append(label)
+                stacks[tuple(stack)] += 1
+            rounds += 1
+            cost = time.perf_counter() - sample_start
+            sampling_time += cost
+            # Sleep long enough that sampling stays within its share of the wall time
+            time.sleep(max(interval - cost, cost * (1 / budget - 1)))
+        elapsed = time.perf_counter() - started
+        return self._report(stacks, rounds, idle, elapsed, sampling_time)
+
+    def _report(
+        self,
+        stacks: Counter,
+        rounds: int,
+        idle: int,
+        elapsed: float,
+        sampling_time: float,
+    ) -> Dict[str, Any]:
+        samples = sum(stacks.values())
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        threads: Counter = Counter()
+        for stack, count in stacks.items():
+            threads[stack[0]] += count
+            self_counts[stack[-1]] += count
+            for frame in set(stack[1:]):
+                total_counts[frame] += count
+
+        def pct(count: int) -> float:
+            return round(100 * count / samples, 2) if samples else 0.0
+
+        top: List[Dict[str, Any]] = [
+            {
+                "function": frame,
+                "self": count,
+                "self_pct": pct(count),
+                "total": total_counts[frame],
+                "total_pct": pct(total_counts[frame]),
+            }
+            for frame, count in self_counts.most_common(settings.PROFILE_TOP_N)
+        ]
+        return {
+            "seconds": round(elapsed, 3),
+            "rounds": rounds,
+            "effective_interval_ms": round(elapsed / rounds * 1000, 3)
+            if rounds
+            else None,
+            "overhead_pct": round(100 * sampling_time / elapsed, 2) if elapsed else 0.0,
+            "samples": samples,
+            "idle_samples": idle,
+            "threads": dict(threads.most_common()),
+            "top": top,
+            "collapsed": collapse(stacks),
+        }
+
+
+def collapse(stacks: Counter, limit: Optional[int] = None) -> str:
+    """Renders stacks in the collapsed format of flamegraph.pl and speedscope: 'a;b;c count' per line."""
+    return "\n".join(
+        f"{';'.join(stack)} {count}" for stack, count in stacks.most_common(limit)
+    )
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,415 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+# OTLP status codes
+STATUS_OK, STATUS_ERROR = 1, 2
+
+# Finished spans written to the file per line (one OTLP export request).
+_EXPORT_BATCH_SIZE = 512
+
+
+class Span:
+    """One timed operation of a trace. A span that is not recording is a no-op."""
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "status_message",
+        "recording",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        trace_id: str,
+        parent_id: Optional[str],
+        kind: int,
+        recording: bool,
+        attributes: Dict[str, Any],
+    ) -> None:
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.status = STATUS_OK
+        self.status_message = ""
+        self.recording = recording
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.recording:
+            self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"[:500]
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """The span in the OTLP/JSON encoding."""
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+# Span in which new spans of the current task or thread start.
+current_span_var: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    Records spans of HTTP requests, UI event handlers, repository calls and SQL statements.
+    The parent span travels in a context variable, so it follows awaits, tasks and the
+    worker hops that copy the caller's context (the UI's database pool, FastAPI's
+    threadpool and the shard fan-out).
+
+    Finished spans go to a bounded queue that one background thread writes to TRACE_FILE
+    as OTLP/JSON lines; when the queue is full, spans are dropped and counted. Whole traces
+    are sampled at their root with TRACE_SAMPLE_RATE. Tracing is off until started.
+    """
+
+    def __init__(self) -> None:
+        self._queue: "Optional[queue.Queue[Span]]" = None
+        self._writer: Optional[threading.Thread] = None
+        self.exported = 0
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._queue is not None
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        *,
+        kind: int = INTERNAL,
+        parent: Optional[Span] = None,
+        trace_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        **attributes: Any,
+    ) -> Iterator[Optional[Span]]:
+        """
+        Times the enclosed block as a child of `parent` (by default the current span), or
+        as a new trace's root. A remote parent can be given by `trace_id` and `parent_id`.
+        Yields the span, or None when tracing is off.
+        """
+        if self._queue is None:
+            yield None
+            return
+        span = self.start_span(
+            name,
+            kind=kind,
+            parent=parent,
+            trace_id=trace_id,
+            parent_id=parent_id,
+            attributes=attributes,
+        )
+        token = current_span_var.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            current_span_var.reset(token)
+            self.end_span(span)
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        kind: int = INTERNAL,
+        parent: Optional[Span] = None,
+        trace_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Span:
+        """
+        Starts a span without making it current; finish it with end_span. Work that outlives
+        the span it was started in (a timer or task created by a page request) begins a new
+        trace instead, noting the trace it followed from.
+        """
+        attributes = attributes or {}
+        if parent is None:
+            parent = current_span_var.get()
+            if parent is not None and parent.end_ns:
+                if parent.recording:
+                    attributes["follows_from"] = parent.trace_id
+                parent = None
+        if parent is not None:
+            trace_id, parent_id, recording = (
+                parent.trace_id,
+                parent.span_id,
+                parent.recording,
+            )
+        else:
+            trace_id = trace_id or os.urandom(16).hex()
+            recording = self._queue is not None and (
+                settings.TRACE_SAMPLE_RATE >= 1.0
+                or random.random() < settings.TRACE_SAMPLE_RATE
+            )
+        return Span(
+            name,
+            trace_id=trace_id,
+            parent_id=parent_id,
+            kind=kind,
+            recording=recording,
+            attributes=attributes,
+        )
+
+    def end_span(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        spans = self._queue
+        if not span.recording or spans is None:
+            return
+        try:
+            spans.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def traced(self, name: Optional[str] = None, **attributes: Any) -> Callable[[F], F]:
+        """Decorates a function or coroutine function to run in a span named after it."""
+
+        def decorate(fn: F) -> F:
+            span_name = name or fn.__qualname__
+
+            if inspect.iscoroutinefunction(fn):
+
+                @functools.wraps(fn)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    if self._queue is None:
+                        return await fn(*args, **kwargs)
+                    with self.span(span_name, **attributes):
+                        return await fn(*args, **kwargs)
+
+                return async_wrapper  # type: ignore[return-value]
+
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if self._queue is None:
+                    return fn(*args, **kwargs)
+                with self.span(span_name, **attributes):
+                    return fn(*args, **kwargs)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorate
+
+    def start(self) -> None:
+        """Starts the writer thread and SQL instrumentation. Does nothing without TRACE_FILE."""
+        if not settings.TRACE_FILE or self._queue is not None:
+            return
+        self._queue = queue.Queue(maxsize=settings.TRACE_QUEUE_SIZE)
+        self._writer = threading.Thread(
+            target=self._write, args=(self._queue,), name="trace-writer", daemon=True
+        )
+        self._writer.start()
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
+
+    def stop(self) -> None:
+        """Writes the spans still queued and stops the writer thread."""
+        if self._queue is None:
+            return
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.remove(Engine, "handle_error", _handle_error)
+        event.remove(Session, "before_commit", _before_commit)
+        event.remove(Session, "after_commit", _after_commit)
+        event.remove(Session, "after_rollback", _after_rollback)
+        spans, self._queue = self._queue, None
+        spans.put(None)
+        self._writer.join()
+        self._writer = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Export counters and queue occupancy."""
+        return {
+            "enabled": self.enabled,
+            "file": settings.TRACE_FILE,
+            "sample_rate": settings.TRACE_SAMPLE_RATE,
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    def _write(self, spans: "queue.Queue[Optional[Span]]") -> None:
+        with open(settings.TRACE_FILE, "a", encoding="utf-8") as output:
+            stopping = False
+            while not stopping:
+                batch: List[Span] = []
+                item = spans.get()
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= _EXPORT_BATCH_SIZE:
+                        break
+                    try:
+                        item = spans.get_nowait()
+                    except queue.Empty:
+                        break
+                stopping = item is None
+                if not batch:
+                    continue
+                try:
+                    output.write(json.dumps(_export_request(batch)) + "\n")
+                    output.flush()
+                    self.exported += len(batch)
+                except Exception:
+                    logger.exception("Writing %d spans failed.", len(batch))
+
+
+def _export_request(spans: List[Span]) -> Dict[str, Any]:
+    """Wraps spans in an OTLP ExportTraceServiceRequest, as the OTLP file exporter writes them."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {
+                            "key": "service.name",
+                            "value": {"stringValue": settings.TRACE_SERVICE_NAME},
+                        }
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [span.to_otlp() for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+def _recording() -> bool:
+    """True if the current task or thread is inside a sampled trace that is still open."""
+    span = current_span_var.get()
+    return span is not None and span.recording and not span.end_ns
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is None or not _recording():
+        return
+    context._trace_span = tracer.start_span(
+        "db.query",
+        kind=CLIENT,
+        attributes={
+            "db.system": "sqlite",
+            "db.statement": statement[:500],
+            "db.executemany": executemany,
+        },
+    )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        context._trace_span = None
+        span.set_attribute("db.rows", cursor.rowcount)
+        tracer.end_span(span)
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        context._trace_span = None
+        span.record_error(exception_context.original_exception)
+        tracer.end_span(span)
+
+
+def _before_commit(session):
+    # The commit span is current until the commit ends, so the flush's statements nest in it
+    if _recording():
+        span = tracer.start_span("db.commit", kind=CLIENT)
+        session.info["trace_commit"] = (span, current_span_var.set(span))
+
+
+def _after_commit(session):
+    _end_commit(session, error=None)
+
+
+def _after_rollback(session):
+    _end_commit(session, error="Rolled back")
+
+
+def _end_commit(session, *, error: Optional[str]) -> None:
+    commit = session.info.pop("trace_commit", None)
+    if commit is None:
+        return
+    span, token = commit
+    try:
+        current_span_var.reset(token)
+    except ValueError:
+        # The commit ended in another context than it began; leave the current span as is
+        pass
+    if error:
+        span.status, span.status_message = STATUS_ERROR, error
+    tracer.end_span(span)
+
+
+tracer = Tracer()
+traced = tracer.traced
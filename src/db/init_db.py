@@ -1,14 +1,48 @@
+from sqlalchemy import Table, inspect, text
+from sqlalchemy.engine import Engine
 from sqlmodel import Session, SQLModel
 from src.core.config import settings
+from src.repositories.item_changes import item_change_repo
 from src.repositories.user import user_repo
 from src.models import models
 from src.db.session import engine
+from src.db.shards import shard_router
+
+
+def add_missing_columns(db_engine: Engine, table: Table) -> None:
+    """
+    Adds columns (and their indexes) that the model has gained since the table was created.
+    create_all() never alters existing tables, and new columns are nullable, so a plain
+    ALTER TABLE ... ADD COLUMN is enough to bring an older database up to date.
+    """
+    existing = {column["name"] for column in inspect(db_engine).get_columns(table.name)}
+    missing = [column for column in table.columns if column.name not in existing]
+    if not missing:
+        return
+    with db_engine.begin() as conn:
+        for column in missing:
+            column_type = column.type.compile(dialect=db_engine.dialect)
+            conn.execute(
+                text(
+                    f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                )
+            )
+    for index in table.indexes:
+        index.create(db_engine, checkfirst=True)
 
 
 def init() -> None:
     """Initializes the database, creating all necessary tables
     and ensuring the first superuser account is created."""
     SQLModel.metadata.create_all(engine)
+    shard_router.create_all()
+
+    # The main database keeps its item table when sharded, for scripts.rebalance_item_shards
+    for item_engine in [engine, *shard_router.engines]:
+        add_missing_columns(item_engine, models.Item.__table__)
+        with Session(item_engine) as session:
+            item_change_repo.backfill(session)
+    add_missing_columns(engine, models.IdempotencyRecord.__table__)
 
     with Session(engine) as session:
         user = user_repo.get_by_email(db=session, email=settings.FIRST_SUPERUSER)
@@ -1,11 +1,18 @@
+from sqlalchemy.engine import Engine
 from sqlmodel import create_engine, Session
 from contextlib import contextmanager
 
 from src.core.config import settings
 
-# SQLite requires check_same_thread=False for multi-threaded access (NiceGUI uses threads)
-connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(settings.DATABASE_URL, echo=True, connect_args=connect_args)
+
+def create_db_engine(url: str) -> Engine:
+    """Creates an engine with the application's connection settings for the given URL."""
+    # SQLite requires check_same_thread=False for multi-threaded access (NiceGUI uses threads)
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    return create_engine(url, connect_args=connect_args)
+
+
+engine = create_db_engine(settings.DATABASE_URL)
 
 
 def get_db():
@@ -0,0 +1,159 @@
+import contextvars
+import heapq
+import itertools
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel, select
+
+from src.core.config import settings
+from src.core.tracing import tracer
+from src.db.session import create_db_engine
+from src.models.models import (
+    Item,
+    ItemChangeHorizon,
+    ItemIdSequence,
+    ItemStats,
+    ItemTombstone,
+)
+
+T = TypeVar("T")
+
+# Tables stored per shard. Item statistics and tombstones live next to the items they
+# describe, so all of them are updated in one shard-local transaction.
+SHARDED_TABLES = [
+    Item.__table__,
+    ItemStats.__table__,
+    ItemTombstone.__table__,
+    ItemChangeHorizon.__table__,
+    ItemIdSequence.__table__,
+]
+
+# Each shard allocates item IDs from its own range, (shard + 1) * SHARD_ID_SPAN onwards,
+# keeping IDs globally unique. IDs below the first range belong to unsharded databases.
+# A shard's ItemIdSequence row records the highest ID it handed out, so rows moved to
+# another shard by scripts.rebalance_item_shards keep IDs their old shard never reuses.
+SHARD_ID_SPAN = 2**40
+
+
+class ShardRouter:
+    """
+    Routes item storage to one of several database files by a stable hash of owner_id.
+    With a shard count of 0 sharding is disabled and every call falls through to the
+    caller's session, so repositories can use the router unconditionally.
+    """
+
+    def __init__(self, count: int, url_template: str) -> None:
+        self.count = count
+        self.url_template = url_template
+        self.engines: List[Engine] = [
+            create_db_engine(self.url_for(shard)) for shard in range(count)
+        ]
+        # Threads start on first use, so an idle pool costs nothing
+        self._executor: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=count, thread_name_prefix="item-shard")
+            if count
+            else None
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.count > 0
+
+    def url_for(self, shard: int) -> str:
+        """Returns the database URL of a shard."""
+        return self.url_template.format(shard=shard)
+
+    def shard_for_owner(self, owner_id: int) -> int:
+        """Maps an owner to its shard. crc32 keeps the mapping stable across processes."""
+        return zlib.crc32(str(owner_id).encode()) % self.count
+
+    @contextmanager
+    def session_for_owner(self, db: Session, owner_id: int) -> Iterator[Session]:
+        """Yields a session on the owner's shard, or `db` itself when sharding is disabled."""
+        if not self.enabled:
+            yield db
+            return
+        with Session(self.engines[self.shard_for_owner(owner_id)]) as session:
+            yield session
+
+    def scatter(self, fn: Callable[[Session], T]) -> List[T]:
+        """Runs `fn` with a session on every shard in parallel and returns the results in shard order."""
+        return self.map_shards(lambda shard, session: fn(session))
+
+    def map_shards(self, fn: Callable[[int, Session], T]) -> List[T]:
+        """Like scatter, but also passes each shard's index to `fn`."""
+
+        def run(shard: int) -> T:
+            with (
+                tracer.span("item_shard", **{"db.shard": shard}),
+                Session(self.engines[shard]) as session,
+            ):
+                return fn(shard, session)
+
+        # Each shard's call runs in its own copy of the caller's context, so its spans
+        # join the caller's trace
+        contexts = [contextvars.copy_context() for _ in range(self.count)]
+        return list(
+            self._executor.map(
+                lambda shard: contexts[shard].run(run, shard), range(self.count)
+            )
+        )
+
+    def gather_sorted(
+        self,
+        fn: Callable[[Session], Iterable[T]],
+        *,
+        key: Callable[[T], Any],
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[T]:
+        """
+        Scatters `fn` across shards and merges the per-shard results, each of which must
+        already be sorted by `key`, into one page with a stable global ordering.
+        """
+        parts = self.scatter(fn)
+        return list(itertools.islice(heapq.merge(*parts, key=key), skip, skip + limit))
+
+    def allocate_item_ids(self, session: Session, owner_id: int, count: int) -> range:
+        """
+        Reserves `count` consecutive item IDs from the range of the owner's shard. Call it only
+        after the transaction has written to the shard, so SQLite's write lock keeps the range exclusive.
+        """
+        return self.allocate_shard_ids(session, self.shard_for_owner(owner_id), count)
+
+    def allocate_shard_ids(self, session: Session, shard: int, count: int) -> range:
+        """
+        Reserves `count` consecutive item IDs after the highest one the shard has handed out,
+        in the running transaction. A count of 0 only records the rows the shard holds.
+        """
+        first = (shard + 1) * SHARD_ID_SPAN
+        # Rows written without the sequence (older databases, raw loads) still push it forward
+        stored = (
+            select(func.coalesce(func.max(Item.id), first - 1))
+            .where(Item.id >= first, Item.id < first + SHARD_ID_SPAN)
+            .scalar_subquery()
+        )
+        last = session.exec(
+            sqlite_insert(ItemIdSequence)
+            .values(id=1, last_id=stored + count)
+            .on_conflict_do_update(
+                index_elements=[ItemIdSequence.id],
+                set_={"last_id": func.max(ItemIdSequence.last_id, stored) + count},
+            )
+            .returning(ItemIdSequence.last_id)
+        ).scalar_one()
+        return range(last - count + 1, last + 1)
+
+    def create_all(self) -> None:
+        """Creates the sharded tables in every shard database."""
+        for engine in self.engines:
+            SQLModel.metadata.create_all(engine, tables=SHARDED_TABLES)
+
+
+shard_router = ShardRouter(settings.ITEM_SHARDS, settings.ITEM_SHARD_URL)
@@ -0,0 +1,180 @@
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Union
+
+from nicegui import Client, ui
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Reports user activity to the server at most every 10 seconds, and immediately when
+# the tab becomes visible again, so idle tabs can be told apart from active ones.
+ACTIVITY_SCRIPT = """
+<script>
+(() => {
+  let last = 0;
+  const report = () => {
+    const now = Date.now();
+    if (now - last > 10000) {
+      last = now;
+      emitEvent("client_activity");
+    }
+  };
+  for (const type of ["pointerdown", "keydown", "wheel"]) {
+    document.addEventListener(type, report, { passive: true });
+  }
+  document.addEventListener("visibilitychange", () => {
+    if (document.visibilityState === "visible") {
+      last = 0;
+      report();
+    }
+  });
+})();
+</script>
+"""
+
+
+@dataclass
+class TrackedPage:
+    """A page that can release its heavy content while idle and rebuild it on return."""
+
+    client: Client
+    evict: Callable[[], None]
+    restore: Callable[[], Union[Awaitable[None], None]]
+    last_activity: float
+    evicted: bool = False
+
+
+class ClientMonitor:
+    """
+    Accounts element counts and estimated memory per NiceGUI client, and tears down the
+    content of tracked pages that are idle or over the per-client or global memory cap.
+    Memory is estimated as element count times CLIENT_ELEMENT_BYTES.
+    """
+
+    def __init__(self) -> None:
+        self._pages: Dict[str, TrackedPage] = {}
+        self.evictions = 0
+        self.restores = 0
+
+    def track(
+        self,
+        *,
+        evict: Callable[[], None],
+        restore: Callable[[], Union[Awaitable[None], None]],
+    ) -> None:
+        """
+        Registers the page being built for eviction. `evict` removes its heavy elements;
+        `restore` rebuilds them once the user is active on the page again.
+        """
+        client = ui.context.client
+        page = TrackedPage(
+            client=client, evict=evict, restore=restore, last_activity=time.monotonic()
+        )
+        self._pages[client.id] = page
+        client.on_delete(lambda: self._pages.pop(client.id, None))
+        ui.add_body_html(ACTIVITY_SCRIPT)
+        ui.on("client_activity", lambda: self._handle_activity(page))
+
+    async def _handle_activity(self, page: TrackedPage) -> None:
+        page.last_activity = time.monotonic()
+        if page.evicted:
+            page.evicted = False
+            self.restores += 1
+            result = page.restore()
+            if inspect.isawaitable(result):
+                await result
+
+    def estimated_bytes(self, client: Client) -> int:
+        return len(client.elements) * settings.CLIENT_ELEMENT_BYTES
+
+    def usage(self) -> List[Dict[str, Any]]:
+        """Per-client element count, estimated memory and idle time, largest first."""
+        now = time.monotonic()
+        rows = []
+        for client in list(Client.instances.values()):
+            page = self._pages.get(client.id)
+            rows.append(
+                {
+                    "client_id": client.id,
+                    "path": getattr(client.page, "path", ""),
+                    "connected": client.has_socket_connection,
+                    "element_count": len(client.elements),
+                    "estimated_bytes": self.estimated_bytes(client),
+                    "idle_seconds": round(now - page.last_activity, 1)
+                    if page
+                    else None,
+                    "tracked": page is not None,
+                    "evicted": page.evicted if page else False,
+                }
+            )
+        rows.sort(key=lambda row: row["estimated_bytes"], reverse=True)
+        return rows
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals across all clients, with the configured limits."""
+        clients = list(Client.instances.values())
+        return {
+            "clients": len(clients),
+            "tracked_pages": len(self._pages),
+            "evicted_pages": sum(page.evicted for page in self._pages.values()),
+            "element_count": sum(len(client.elements) for client in clients),
+            "estimated_bytes": sum(self.estimated_bytes(client) for client in clients),
+            "evictions": self.evictions,
+            "restores": self.restores,
+            "idle_timeout": settings.CLIENT_IDLE_TIMEOUT,
+            "max_client_bytes": settings.CLIENT_MAX_BYTES,
+            "max_total_bytes": settings.CLIENT_MAX_TOTAL_BYTES,
+        }
+
+    def sweep(self) -> int:
+        """Evicts idle and oversized pages, then least recently used pages while over the global cap."""
+        now = time.monotonic()
+        evicted = 0
+        live = [page for page in self._pages.values() if not page.evicted]
+        for page in live:
+            idle = now - page.last_activity
+            if (
+                settings.CLIENT_IDLE_TIMEOUT and idle > settings.CLIENT_IDLE_TIMEOUT
+            ) or self.estimated_bytes(page.client) > settings.CLIENT_MAX_BYTES:
+                evicted += self._evict(page)
+
+        total = sum(self.estimated_bytes(c) for c in list(Client.instances.values()))
+        for page in sorted(live, key=lambda page: page.last_activity):
+            if total <= settings.CLIENT_MAX_TOTAL_BYTES:
+                break
+            if page.evicted:
+                continue
+            before = self.estimated_bytes(page.client)
+            evicted += self._evict(page)
+            total -= before - self.estimated_bytes(page.client)
+        return evicted
+
+    def _evict(self, page: TrackedPage) -> int:
+        try:
+            with page.client:
+                page.evict()
+        except Exception:
+            logger.exception("Evicting page of client %s failed.", page.client.id)
+            return 0
+        page.evicted = True
+        self.evictions += 1
+        return 1
+
+    async def run_periodically(self) -> None:
+        """Sweeps every CLIENT_SWEEP_INTERVAL seconds."""
+        while True:
+            await asyncio.sleep(settings.CLIENT_SWEEP_INTERVAL)
+            try:
+                evicted = self.sweep()
+                if evicted:
+                    logger.info("Evicted %s idle or oversized pages.", evicted)
+            except Exception:
+                logger.exception("Client memory sweep failed.")
+
+
+client_monitor = ClientMonitor()
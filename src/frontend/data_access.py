@@ -0,0 +1,176 @@
+import asyncio
+import contextvars
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+from sqlmodel import Session
+
+from src.backend.deps import get_user_from_token
+from src.core.config import settings
+from src.core.tracing import tracer
+from src.db.session import get_db_context
+from src.frontend.components.auth_utils import get_token_from_state
+from src.models import User
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Number of recent samples kept for percentiles.
+_SAMPLE_SIZE = 1024
+
+
+def _summarize_ms(samples: Deque[float]) -> Dict[str, float]:
+    """Median, 99th percentile and maximum of a window of samples in seconds, in milliseconds."""
+    if not samples:
+        return {"p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p99_ms": round(
+            ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)] * 1000, 3
+        ),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _run_in_span(wait: float, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Calls `fn` in a span of the worker hop, noting how long the call queued for a worker."""
+    with tracer.span("ui_db.call", **{"ui_db.wait_ms": round(wait * 1000, 3)}):
+        return fn(*args, **kwargs)
+
+
+class UIDataAccess:
+    """
+    Runs the UI's synchronous database work on a bounded pool of UI_DB_WORKERS threads,
+    so a slow query never stalls the event loop that serves every websocket.
+    Context variables of the caller are copied into the worker.
+    """
+
+    def __init__(self) -> None:
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._waits: Deque[float] = deque(maxlen=_SAMPLE_SIZE)
+        self._runs: Deque[float] = deque(maxlen=_SAMPLE_SIZE)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.UI_DB_WORKERS, thread_name_prefix="ui-db"
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Calls `fn(*args, **kwargs)` in a worker thread and awaits its result."""
+        context = contextvars.copy_context()
+        submitted = time.perf_counter()
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        def call() -> T:
+            started = time.perf_counter()
+            try:
+                return context.run(
+                    _run_in_span, started - submitted, fn, *args, **kwargs
+                )
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                raise
+            finally:
+                with self._lock:
+                    self._waits.append(started - submitted)
+                    self._runs.append(time.perf_counter() - started)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def run_with_session(self, fn: Callable[[Session], T]) -> T:
+        """Calls `fn(db)` in a worker thread with a session opened and closed there."""
+
+        def call() -> T:
+            with get_db_context() as db:
+                return fn(db)
+
+        return await self.run(call)
+
+    async def run_as_user(self, fn: Callable[[Session, User], T]) -> T:
+        """
+        Calls `fn(db, current_user)` in a worker thread. The token is read from UI state
+        here on the event loop; the user is loaded from it in the worker.
+        """
+        token = get_token_from_state()
+        return await self.run_with_session(
+            lambda db: fn(db, get_user_from_token(db=db, token=token))
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Call counters, pool occupancy, and queue wait and run times of recent calls."""
+        with self._lock:
+            return {
+                "workers": settings.UI_DB_WORKERS,
+                "calls": self.calls,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "wait": _summarize_ms(self._waits),
+                "run": _summarize_ms(self._runs),
+            }
+
+    def shutdown(self) -> None:
+        """Stops the worker threads once queued calls have finished."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes from a sleep of LOOP_LAG_INTERVAL seconds.
+    Any lateness is time the loop spent blocked, during which no client was served.
+    """
+
+    def __init__(self) -> None:
+        self._lags: Deque[float] = deque(maxlen=_SAMPLE_SIZE)
+        self.last = 0.0
+        self.stalls = 0
+
+    async def run_periodically(self) -> None:
+        """Probes the loop forever, logging lags above LOOP_LAG_WARN_MS."""
+        while True:
+            interval = settings.LOOP_LAG_INTERVAL
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.last = max(time.perf_counter() - start - interval, 0.0)
+            self._lags.append(self.last)
+            if self.last * 1000 > settings.LOOP_LAG_WARN_MS:
+                self.stalls += 1
+                logger.warning("Event loop was blocked for %.0f ms.", self.last * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        """Latest, median, 99th percentile and maximum lag of recent probes."""
+        return {
+            "samples": len(self._lags),
+            "last_ms": round(self.last * 1000, 3),
+            "stalls": self.stalls,
+            **_summarize_ms(self._lags),
+        }
+
+
+ui_db = UIDataAccess()
+loop_lag = LoopLagMonitor()
@@ -53,6 +53,17 @@ def dashboard_frame(title: str):
                             ui.label("Create User").classes(
                                 "text-gray-700 text-bold text-xl"
                             )
+                    with (
+                        ui.item(on_click=lambda: ui.navigate.to("/users/import"))
+                        .props("clickable")
+                        .classes("w-full")
+                    ):
+                        with ui.item_section().props("avatar"):
+                            ui.icon("group_add", color="gray-500")
+                        with ui.item_section():
+                            ui.label("Import Users").classes(
+                                "text-gray-700 text-bold text-xl"
+                            )
 
             with ui.list().classes("w-full"):
                 ui.separator().classes("my-2")
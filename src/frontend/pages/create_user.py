@@ -1,10 +1,11 @@
 from fastapi import HTTPException
 from nicegui import app, ui
-from src.models import UserCreate
-from src.db.session import get_db_context
+from sqlmodel import Session
+from src.core.tracing import traced
+from src.models import User, UserCreate
 from src.repositories.user import user_repo
+from src.frontend.data_access import ui_db
 from src.frontend.layouts.default import dashboard_frame
-from src.frontend.components.auth_utils import get_current_user_from_state
 from src.frontend.components.form_utils import enable_button_on_user_inputs
 from src.frontend.components import notifications
 
@@ -59,23 +60,20 @@ def create_user_page():
             enable_button_on_user_inputs([email, password], user_button)
 
 
+@traced("ui.create_user")
 async def create_user(
     email_input: ui.input, password_input: ui.input, is_superuser_checkbox: ui.checkbox
 ):
-    """Creates a new user using data from the input elements."""
+    """Creates a new user using data from the input elements, hashing and storing it in a worker thread."""
     try:
-        with get_db_context() as db:
-            current_user = get_current_user_from_state(db)
-            if not current_user.is_superuser:
-                raise HTTPException(
-                    status_code=403, detail="You do not have enough privileges."
-                )
-            user_in = UserCreate(
-                email=email_input.value,
-                password=password_input.value,
-                is_superuser=is_superuser_checkbox.value,
-            )
-            user_repo.register(db=db, obj_in=user_in)
+        user_in = UserCreate(
+            email=email_input.value,
+            password=password_input.value,
+            is_superuser=is_superuser_checkbox.value,
+        )
+        await ui_db.run_as_user(
+            lambda db, current_user: register_user(db, current_user, user_in)
+        )
 
         notifications.show_success(f"User '{email_input.value}' created successfully!")
         email_input.value = ""
@@ -85,3 +83,12 @@ async def create_user(
         notifications.show_error(e.detail)
     except Exception as e:
         notifications.show_error(f"An unexpected error occurred: {e}")
+
+
+def register_user(db: Session, current_user: User, user_in: UserCreate) -> User:
+    """Registers a user on behalf of the current user, who must be a superuser."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="You do not have enough privileges."
+        )
+    return user_repo.register(db=db, obj_in=user_in)
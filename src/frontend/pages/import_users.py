@@ -0,0 +1,141 @@
+import contextvars
+from pathlib import Path
+
+from fastapi import HTTPException
+from nicegui import app, run, ui
+from nicegui.events import UploadEventArguments
+from sqlmodel import Session
+from src.core.tracing import traced
+from src.models import User
+from src.services.imports import (
+    ImportJob,
+    detect_format,
+    import_jobs,
+    new_spool_path,
+    remove_spool,
+)
+from src.services.user_import import run_user_import
+from src.frontend.components import notifications
+from src.frontend.data_access import ui_db
+from src.frontend.layouts.default import dashboard_frame
+
+
+@ui.page("/users/import")
+def import_users_page():
+    """Defines the page for importing users in bulk from a file."""
+    with dashboard_frame(title="Import Users"):
+        if not app.storage.user.get("is_superuser"):
+            ui.label("You don't have permission to access this page.").classes(
+                "text-red-500"
+            )
+            return
+
+        with ui.card().classes("w-full max-w-3xl p-8"):
+            ui.label("Import Users").classes("text-h4")
+            ui.label(
+                "Upload a CSV or NDJSON file with email and password fields, and "
+                "optionally full_name, is_active and is_superuser."
+            ).classes("text-sm text-gray-600")
+            progress = ui.linear_progress(value=0, show_value=False).classes("w-full")
+            status = ui.label().classes("text-sm")
+            errors_table = ui.table(
+                columns=[
+                    {"name": "row", "label": "Row", "field": "row", "align": "left"},
+                    {
+                        "name": "error",
+                        "label": "Error",
+                        "field": "error",
+                        "align": "left",
+                    },
+                ],
+                rows=[],
+            ).classes("w-full")
+            errors_table.set_visibility(False)
+            # The most recent import on this page, whose results the button downloads
+            last_import = {}
+            download_button = ui.button(
+                "Download Results",
+                icon="download",
+                on_click=lambda: download_results(last_import["job"]),
+            ).props("outline color=primary")
+            download_button.set_visibility(False)
+            ui.upload(
+                auto_upload=True,
+                on_upload=lambda e: import_users(
+                    e, progress, status, errors_table, download_button, last_import
+                ),
+            ).props('accept=".csv,.ndjson,.jsonl"').classes("w-full")
+
+
+@traced("ui.import_users")
+async def import_users(
+    event: UploadEventArguments,
+    progress: ui.linear_progress,
+    status: ui.label,
+    errors_table: ui.table,
+    download_button: ui.button,
+    last_import: dict,
+):
+    """Imports users from an uploaded file in a worker thread, showing progress while it runs."""
+    path = None
+    try:
+        fmt = detect_format(event.file.name)
+        current_user = await ui_db.run_as_user(require_superuser)
+
+        path = new_spool_path()
+        await event.file.save(path)
+        job = import_jobs.create(
+            kind="users",
+            owner_id=current_user.id,
+            filename=event.file.name,
+            total_bytes=event.file.size(),
+        )
+
+        def show_progress():
+            progress.set_value(job.progress)
+            status.set_text(f"{job.rows_imported} created, {job.error_count} rejected")
+
+        errors_table.set_visibility(False)
+        download_button.set_visibility(False)
+        timer = ui.timer(0.5, show_progress)
+        try:
+            await run.io_bound(
+                contextvars.copy_context().run, run_user_import, job.id, path, fmt
+            )
+        finally:
+            timer.cancel()
+        show_progress()
+
+        errors_table.rows = [{"row": e.row, "error": e.error} for e in job.errors]
+        errors_table.set_visibility(bool(job.errors))
+        last_import["job"] = job
+        download_button.set_visibility(job.result_path is not None)
+        if job.status == "failed":
+            notifications.show_error(job.detail)
+        else:
+            notifications.show_success(
+                f"Created {job.rows_imported} users from '{job.filename}'."
+            )
+    except HTTPException as e:
+        if path:
+            remove_spool(path)
+        notifications.show_error(e.detail)
+    except Exception as e:
+        if path:
+            remove_spool(path)
+        notifications.show_error(f"An unexpected error occurred: {e}")
+
+
+def require_superuser(db: Session, current_user: User) -> User:
+    """Returns the current user if they are a superuser."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="You do not have enough privileges."
+        )
+    return current_user
+
+
+async def download_results(job: ImportJob):
+    """Sends the per-row result CSV of an import to the browser."""
+    content = await run.io_bound(Path(job.result_path).read_bytes)
+    ui.download.content(content, f"{job.filename}.results.csv", media_type="text/csv")
@@ -1,10 +1,21 @@
+import contextvars
+
 from fastapi import HTTPException
-from nicegui import ui
-from src.models import ItemCreate, ItemUpdate
+from nicegui import run, ui
+from nicegui.events import UploadEventArguments
+from src.core.tracing import traced, tracer
+from src.models import Item, ItemCreate, ItemUpdate
 from src.repositories.item import item_repo
-from src.db.session import get_db_context
+from src.services.imports import (
+    detect_format,
+    import_jobs,
+    new_spool_path,
+    remove_spool,
+)
+from src.services.item_import import run_item_import
 from src.frontend.components import notifications
-from src.frontend.components.auth_utils import get_current_user_from_state
+from src.frontend.client_monitor import client_monitor
+from src.frontend.data_access import ui_db
 from src.frontend.layouts.default import dashboard_frame
 
 
@@ -27,94 +38,142 @@ def items_page():
                 ),
             ).classes("w-full")
 
-        ui.button("Create Item", on_click=dialog.open, icon="add").props(
-            "color=primary"
-        )
+        with ui.dialog() as import_dialog, ui.card().classes("min-w-[600px]"):
+            ui.label("Import Items").classes("text-h6")
+            ui.label(
+                "Upload a CSV or NDJSON file with title and description fields."
+            ).classes("text-sm text-gray-600")
+            import_progress = ui.linear_progress(value=0, show_value=False).classes(
+                "w-full"
+            )
+            import_status = ui.label().classes("text-sm")
+            import_errors = ui.table(
+                columns=[
+                    {"name": "row", "label": "Row", "field": "row", "align": "left"},
+                    {
+                        "name": "error",
+                        "label": "Error",
+                        "field": "error",
+                        "align": "left",
+                    },
+                ],
+                rows=[],
+            ).classes("w-full")
+            import_errors.set_visibility(False)
+            ui.upload(
+                auto_upload=True,
+                on_upload=lambda e: import_items(
+                    e, import_progress, import_status, import_errors, items_grid
+                ),
+            ).props('accept=".csv,.ndjson,.jsonl"').classes("w-full")
+
+        with ui.row().classes("gap-2"):
+            ui.button("Create Item", on_click=dialog.open, icon="add").props(
+                "color=primary"
+            )
+            ui.button("Import Items", on_click=import_dialog.open, icon="upload").props(
+                "outline color=primary"
+            )
         ui.timer(0.1, lambda: load_items(items_grid), once=True)
+        client_monitor.track(
+            evict=lambda: release_items(items_grid),
+            restore=lambda: load_items(items_grid),
+        )
 
 
+@traced("ui.load_items")
 async def load_items(grid: ui.grid):
-    """Fetches items by directly calling repository functions and populates the grid."""
+    """Fetches items through repository functions in a worker thread and populates the grid."""
     try:
-        with get_db_context() as db:
-            current_user = get_current_user_from_state(db)
-            items = item_repo.get_for_user(db=db, current_user=current_user)
-
-        grid.clear()
-        with grid:
-            for item in items:
-                with ui.card().classes("p-0"):
-                    ui.image(f"https://picsum.photos/600/400?random={item.id}")
-                    with ui.column().classes("p-4 w-full"):
-                        ui.label(item.title).classes("text-xl font-semibold")
-                        ui.separator().classes("w-full my-1")
-                        ui.label(item.description).classes("text-sm line-clamp-3")
-
-                        with ui.row().classes("w-full justify-end mt-4 gap-2"):
-                            # Modify Button - opens its own dialog
-                            with (
-                                ui.dialog() as modify_dialog,
-                                ui.card().classes("min-w-[600px]"),
-                            ):
-                                ui.label("Modify Item").classes("text-h6")
-                                modify_title = ui.input(
-                                    "Title", value=item.title
-                                ).classes("w-full")
-                                modify_desc = ui.textarea(
-                                    "Description", value=item.description
-                                ).classes("w-full")
-                                # The lambda captures the item's specific data for the handler
+        items = await ui_db.run_as_user(
+            lambda db, current_user: item_repo.get_for_user(
+                db=db, current_user=current_user
+            )
+        )
+
+        with tracer.span("ui.render_items", items=len(items)):
+            grid.clear()
+            with grid:
+                for item in items:
+                    with ui.card().classes("p-0"):
+                        ui.image(f"https://picsum.photos/600/400?random={item.id}")
+                        with ui.column().classes("p-4 w-full"):
+                            ui.label(item.title).classes("text-xl font-semibold")
+                            ui.separator().classes("w-full my-1")
+                            ui.label(item.description).classes("text-sm line-clamp-3")
+
+                            with ui.row().classes("w-full justify-end mt-4 gap-2"):
+                                # Dialogs are built when opened, so a card only holds its buttons
+                                ui.button(
+                                    icon="edit",
+                                    on_click=lambda i=item: open_modify_dialog(i, grid),
+                                ).props("flat dense")
                                 ui.button(
-                                    "Save",
-                                    on_click=lambda i=item,
-                                    t=modify_title,
-                                    d=modify_desc: update_item(
-                                        i.id, t, d, modify_dialog, grid
-                                    ),
-                                ).classes("w-full")
-
-                            ui.button(icon="edit", on_click=modify_dialog.open).props(
-                                "flat dense"
-                            )
-
-                            # Delete Button - opens a confirmation dialog
-                            with ui.dialog() as confirm_dialog, ui.card():
-                                ui.label(
-                                    f"Are you sure you want to delete '{item.title}'?"
-                                )
-                                with ui.row().classes("w-full justify-end"):
-                                    ui.button(
-                                        "Cancel",
-                                        on_click=confirm_dialog.close,
-                                        color="gray-100",
-                                    )
-                                    # The lambda captures the specific item_id for the handler
-                                    ui.button(
-                                        "Yes",
-                                        on_click=lambda item_id=item.id: delete_item(
-                                            item_id, grid
-                                        ),
-                                        color="red",
-                                    )
-
-                            ui.button(
-                                icon="delete", on_click=confirm_dialog.open
-                            ).props("flat dense color=red")
+                                    icon="delete",
+                                    on_click=lambda i=item: open_delete_dialog(i, grid),
+                                ).props("flat dense color=red")
     except HTTPException as e:
         notifications.show_error(e.detail)
     except Exception as e:
         notifications.show_error(f"An unexpected error occurred: {e}")
 
 
+def release_items(grid: ui.grid):
+    """Tears down the item cards of an idle page; they are rebuilt on the user's next activity."""
+    grid.clear()
+    with grid:
+        ui.label("Paused while idle. Your items reload when you return.").classes(
+            "text-gray-500"
+        )
+
+
+def open_modify_dialog(item: Item, grid: ui.grid):
+    """Builds and opens the modify dialog for an item. It is deleted again once closed."""
+    with grid.parent_slot.parent:
+        with ui.dialog() as modify_dialog, ui.card().classes("min-w-[600px]"):
+            ui.label("Modify Item").classes("text-h6")
+            modify_title = ui.input("Title", value=item.title).classes("w-full")
+            modify_desc = ui.textarea("Description", value=item.description).classes(
+                "w-full"
+            )
+            ui.button(
+                "Save",
+                on_click=lambda: update_item(
+                    item.id, modify_title, modify_desc, modify_dialog, grid
+                ),
+            ).classes("w-full")
+    modify_dialog.on("hide", modify_dialog.delete)
+    modify_dialog.open()
+
+
+def open_delete_dialog(item: Item, grid: ui.grid):
+    """Builds and opens the delete confirmation for an item. It is deleted again once closed."""
+    with grid.parent_slot.parent:
+        with ui.dialog() as confirm_dialog, ui.card():
+            ui.label(f"Are you sure you want to delete '{item.title}'?")
+            with ui.row().classes("w-full justify-end"):
+                ui.button("Cancel", on_click=confirm_dialog.close, color="gray-100")
+                ui.button(
+                    "Yes",
+                    on_click=lambda: delete_item(item.id, grid, confirm_dialog),
+                    color="red",
+                )
+    confirm_dialog.on("hide", confirm_dialog.delete)
+    confirm_dialog.open()
+
+
+@traced("ui.create_item")
 async def create_item(
     title_input: ui.input, desc_input: ui.textarea, dialog: ui.dialog, grid: ui.grid
 ):
-    """Creates a new item by directly calling repository functions."""
+    """Creates a new item through repository functions in a worker thread."""
     try:
-        with get_db_context() as db:
-            current_user = get_current_user_from_state(db)
-            item_in = ItemCreate(title=title_input.value, description=desc_input.value)
-            item_repo.create_for_user(db=db, obj_in=item_in, current_user=current_user)
+        item_in = ItemCreate(title=title_input.value, description=desc_input.value)
+        await ui_db.run_as_user(
+            lambda db, current_user: item_repo.create_for_user(
+                db=db, obj_in=item_in, current_user=current_user
+            )
+        )
 
         notifications.show_success("Item created successfully!")
         dialog.close()
@@ -125,6 +184,7 @@ async def create_item(
         notifications.show_error(f"An unexpected error occurred: {e}")
 
 
+@traced("ui.update_item")
 async def update_item(
     item_id: int,
     title_input: ui.input,
@@ -132,17 +192,17 @@ async def update_item(
     dialog: ui.dialog,
     grid: ui.grid,
 ):
-    """Updates an item by directly calling repository functions."""
+    """Updates an item through repository functions in a worker thread."""
     try:
-        with get_db_context() as db:
-            current_user = get_current_user_from_state(db)
-            item_in = ItemUpdate(title=title_input.value, description=desc_input.value)
-            item_repo.update_for_user(
+        item_in = ItemUpdate(title=title_input.value, description=desc_input.value)
+        await ui_db.run_as_user(
+            lambda db, current_user: item_repo.update_for_user(
                 db=db,
                 item_id=item_id,
                 obj_in=item_in,
                 current_user=current_user,
             )
+        )
 
         notifications.show_success("Item updated successfully.")
         dialog.close()
@@ -154,17 +214,77 @@ async def update_item(
         notifications.show_error(f"An unexpected error occurred: {e}")
 
 
-async def delete_item(item_id: int, grid: ui.grid):
-    """Deletes an item by directly calling repository functions."""
+@traced("ui.delete_item")
+async def delete_item(item_id: int, grid: ui.grid, dialog: ui.dialog):
+    """Deletes an item through repository functions in a worker thread."""
     try:
-        with get_db_context() as db:
-            current_user = get_current_user_from_state(db)
-            item_repo.delete_for_user(db=db, item_id=item_id, current_user=current_user)
+        await ui_db.run_as_user(
+            lambda db, current_user: item_repo.delete_for_user(
+                db=db, item_id=item_id, current_user=current_user
+            )
+        )
 
         notifications.show_success("Item deleted successfully.")
+        dialog.close()
         await load_items(grid)
 
     except HTTPException as e:
         notifications.show_error(e.detail)
     except Exception as e:
         notifications.show_error(f"An unexpected error occurred: {e}")
+
+
+@traced("ui.import_items")
+async def import_items(
+    event: UploadEventArguments,
+    progress: ui.linear_progress,
+    status: ui.label,
+    errors_table: ui.table,
+    grid: ui.grid,
+):
+    """Imports items from an uploaded file in a worker thread, showing progress while it runs."""
+    path = None
+    try:
+        fmt = detect_format(event.file.name)
+        current_user = await ui_db.run_as_user(lambda db, current_user: current_user)
+
+        path = new_spool_path()
+        await event.file.save(path)
+        job = import_jobs.create(
+            kind="items",
+            owner_id=current_user.id,
+            filename=event.file.name,
+            total_bytes=event.file.size(),
+        )
+
+        def show_progress():
+            progress.set_value(job.progress)
+            status.set_text(f"{job.rows_imported} imported, {job.error_count} rejected")
+
+        errors_table.set_visibility(False)
+        timer = ui.timer(0.5, show_progress)
+        try:
+            await run.io_bound(
+                contextvars.copy_context().run, run_item_import, job.id, path, fmt
+            )
+        finally:
+            timer.cancel()
+        show_progress()
+
+        errors_table.rows = [{"row": e.row, "error": e.error} for e in job.errors]
+        errors_table.set_visibility(bool(job.errors))
+        if job.status == "failed":
+            notifications.show_error(job.detail)
+        else:
+            notifications.show_success(
+                f"Imported {job.rows_imported} items from '{job.filename}'."
+            )
+        await load_items(grid)
+    except HTTPException as e:
+        if path:
+            remove_spool(path)
+        notifications.show_error(e.detail)
+    except Exception as e:
+        if path:
+            remove_spool(path)
+        notifications.show_error(f"An unexpected error occurred: {e}")
@@ -2,8 +2,9 @@ from fastapi import HTTPException
 from nicegui import app, ui
 from src.repositories.user import user_repo
 from src.core import security
-from src.db.session import get_db_context
+from src.core.tracing import traced
 from src.frontend import state
+from src.frontend.data_access import ui_db
 from src.frontend.components.form_utils import enable_button_on_user_inputs
 from src.frontend.components import notifications
 
@@ -45,22 +46,24 @@ def login_page():
         enable_button_on_user_inputs([email, password], login_button)
 
 
+@traced("ui.perform_login")
 async def perform_login(email_input: ui.input, password_input: ui.input):
     """Sends user credentials to the backend."""
     if not email_input.validate() or not password_input.validate():
         return
     try:
-        with get_db_context() as db:
-            user = user_repo.authenticate(
-                db=db, email=email_input.value, password=password_input.value
-            )
-            auth_data = {
-                "access_token": security.create_access_token(user.id),
-                "token_type": "bearer",
-            }
-            state.set_auth(auth_data)
-            app.storage.user["is_superuser"] = user.is_superuser
-            ui.navigate.to("/items")
+        email, password = email_input.value, password_input.value
+        # Password verification is deliberately slow, so it runs in a worker thread
+        user = await ui_db.run_with_session(
+            lambda db: user_repo.authenticate(db=db, email=email, password=password)
+        )
+        auth_data = {
+            "access_token": security.create_access_token(user.id),
+            "token_type": "bearer",
+        }
+        state.set_auth(auth_data)
+        app.storage.user["is_superuser"] = user.is_superuser
+        ui.navigate.to("/items")
     except HTTPException as e:
         notifications.show_error(e.detail)
     except Exception as e:
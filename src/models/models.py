@@ -1,4 +1,5 @@
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -67,6 +68,9 @@ class Item(ItemBase, table=True):
     owner: Optional["User"] = Relationship(
         back_populates="items", sa_relationship_kwargs={"foreign_keys": "Item.owner_id"}
     )
+    # Change feed position: every insert or update moves the item to the end of the feed.
+    updated_at: Optional[datetime] = None
+    change_seq: Optional[int] = Field(default=None, index=True)
 
 
 class ItemRead(ItemBase):
@@ -74,3 +78,116 @@ class ItemRead(ItemBase):
 
     id: int
     owner_id: int
+
+
+class ItemTombstone(SQLModel, table=True):
+    """Records a deleted item in the change feed, sharing the change sequence of the item table,
+    so consumers that synced the item earlier learn that it is gone."""
+
+    item_id: int = Field(primary_key=True)
+    owner_id: Optional[int] = None
+    change_seq: int = Field(index=True)
+    deleted_at: datetime
+
+
+class ItemChangeHorizon(SQLModel, table=True):
+    """The highest change sequence number whose tombstones were pruned from a database (one row).
+    Change cursors below it may have missed deletes and must sync again from the start."""
+
+    id: int = Field(default=1, primary_key=True)
+    pruned_seq: int = 0
+
+
+class ItemIdSequence(SQLModel, table=True):
+    """The highest item ID a shard has handed out (one row). It never decreases, so IDs of rows
+    deleted or moved to another shard are not reissued."""
+
+    id: int = Field(default=1, primary_key=True)
+    last_id: int = 0
+
+
+class ItemChangeRead(SQLModel):
+    """One entry of the item change feed: an upsert carrying the item's current state, or a delete."""
+
+    op: str
+    id: int
+    change_seq: int
+    changed_at: Optional[datetime] = None
+    item: Optional[ItemRead] = None
+
+
+class ItemChangesPage(SQLModel):
+    """A page of the item change feed. Pass `cursor` as `since` to fetch the next page;
+    has_more is False once the consumer has caught up."""
+
+    changes: List[ItemChangeRead]
+    cursor: str
+    has_more: bool
+
+
+class ItemStatsBase(SQLModel):
+    """The base model for per-owner item statistics: the owner and their item count."""
+
+    owner_id: int = Field(primary_key=True, foreign_key="user.id")
+    item_count: int = 0
+
+
+class ItemStats(ItemStatsBase, table=True):
+    """The database table model holding one row of materialized statistics per item owner.
+    It is updated in the same transaction as every item insert or delete, so reads never touch the item table."""
+
+    pass
+
+
+class ItemStatsRead(ItemStatsBase):
+    """The model for returning per-owner item statistics in API responses."""
+
+    pass
+
+
+class ItemCacheInvalidation(SQLModel, table=True):
+    """A notice, written by the process that changed an owner's items, that other processes must drop
+    their cached item lists of that owner. Rows are pruned shortly after they are written."""
+
+    # IDs only grow, even after pruning, so readers can poll for IDs above the last one seen.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    owner_id: int
+    origin: str
+    created_at: float = Field(index=True)
+
+
+class IdempotencyRecord(SQLModel, table=True):
+    """The stored response of a request made with an Idempotency-Key, replayed to retries of that request
+    by any process until it expires. Keys are scoped to the endpoint and the user who sent them."""
+
+    key: str = Field(primary_key=True)
+    fingerprint: str
+    status_code: int
+    body: str
+    # JSON object of the response's own headers, if it had any
+    headers: Optional[str] = None
+    expires_at: float = Field(index=True)
+
+
+class ImportRowError(SQLModel):
+    """A row rejected by a file import, identified by its 1-based data row number."""
+
+    row: int
+    error: str
+
+
+class ImportJobRead(SQLModel):
+    """The model for reporting the progress and per-row errors of a background file import.
+    Only the first IMPORT_MAX_REPORTED_ERRORS errors are listed; error_count holds the total."""
+
+    id: str
+    status: str
+    filename: str
+    progress: float
+    rows_processed: int
+    rows_imported: int
+    error_count: int
+    errors: List[ImportRowError]
+    detail: Optional[str] = None
@@ -1,29 +1,79 @@
-from typing import Optional, List
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, List, Tuple
 from fastapi import HTTPException
+from sqlalchemy import delete, insert, update
 from sqlmodel import Session, select
-from src.models.models import Item, ItemCreate, ItemUpdate, User
+from src.core.tracing import traced
+from src.db.shards import shard_router
+from src.models.models import Item, ItemCreate, ItemRead, ItemUpdate, User
+from src.repositories.item_cache import ALL_ITEMS, item_list_cache
+from src.repositories.item_changes import NEXT_CHANGE_SEQ, item_change_repo, utcnow
+from src.repositories.item_stats import item_stats_repo
+from src.repositories.item_titles import item_title_filter
+
+# Item columns in ItemRead field order, so plain rows serialize exactly like ItemRead.
+ITEM_READ_COLUMNS = [getattr(Item, name) for name in ItemRead.model_fields]
 
 
 class ItemRepository:
+    @traced()
     def get_for_user(self, db: Session, *, current_user: User) -> List[Item]:
         """
         Retrieves all items for a superuser, or only items belonging to a normal user.
+        Built from the cached rows of get_rows_for_user, so the items are not attached to a session.
         """
-        if current_user.is_superuser:
-            return self.get_multi(db)
-        else:
-            return self.get_multi_by_owner(db, owner_id=current_user.id)
+        rows = self.get_rows_for_user(db, current_user=current_user)
+        return [Item(**row) for row in rows]
 
+    @traced()
+    def get_rows_for_user(
+        self, db: Session, *, current_user: User, skip: int = 0, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Same selection as get_for_user, but returns plain dicts holding only the
+        ItemRead columns. Skips ORM object and pydantic model construction per row.
+        Pages are served from the item list cache, which this repository's writes keep current.
+        """
+        scope = ALL_ITEMS if current_user.is_superuser else current_user.id
+        return item_list_cache.get_or_load(
+            scope,
+            skip,
+            limit,
+            lambda: self._load_rows(db, scope=scope, skip=skip, limit=limit),
+        )
+
+    def _load_rows(
+        self, db: Session, *, scope: Optional[int], skip: int, limit: int
+    ) -> List[Dict[str, Any]]:
+        statement = select(*ITEM_READ_COLUMNS)
+        if scope is ALL_ITEMS:
+            if shard_router.enabled:
+                return shard_router.gather_sorted(
+                    lambda session: [
+                        row._asdict()
+                        for row in session.exec(
+                            statement.order_by(Item.id).limit(skip + limit)
+                        )
+                    ],
+                    key=lambda row: row["id"],
+                    skip=skip,
+                    limit=limit,
+                )
+            rows = db.exec(statement.order_by(Item.id).offset(skip).limit(limit))
+            return [row._asdict() for row in rows]
+        statement = statement.where(Item.owner_id == scope)
+        with shard_router.session_for_owner(db, scope) as session:
+            rows = session.exec(statement.offset(skip).limit(limit))
+            return [row._asdict() for row in rows]
+
+    @traced()
     def create_for_user(
         self, db: Session, *, obj_in: ItemCreate, current_user: User
     ) -> Item:
         """
         Creates a new item for the current user, first checking for duplicate titles.
         """
-        existing_item = self.get_by_title_and_owner(
-            db=db, title=obj_in.title, owner_id=current_user.id
-        )
-        if existing_item:
+        if self.title_exists(db, title=obj_in.title, owner_id=current_user.id):
             raise HTTPException(
                 status_code=409,
                 detail="An item with this title already exists.",
@@ -37,6 +87,64 @@ class ItemRepository:
                 detail="An unexpected error occurred while creating the item.",
             )
 
+    @traced()
+    def create_many_for_owner(
+        self, db: Session, *, objs_in: List[ItemCreate], owner_id: int
+    ) -> List[Optional[str]]:
+        """
+        Inserts a chunk of items for one owner with a single executemany.
+        Titles that already exist for the owner, or repeat within the chunk, are skipped.
+        Returns one entry per input: None if inserted, otherwise the rejection reason.
+        """
+        possible = item_title_filter.possible(
+            owner_id,
+            list({obj_in.title for obj_in in objs_in}),
+            lambda limit: self._load_titles(db, owner_id=owner_id, limit=limit),
+            lambda seq, limit: self._titles_changed_since(
+                db, owner_id=owner_id, seq=seq, limit=limit
+            ),
+        )
+        with shard_router.session_for_owner(db, owner_id) as session:
+            existing = set()
+            if possible:
+                existing = set(
+                    session.exec(
+                        select(Item.title).where(
+                            Item.owner_id == owner_id, Item.title.in_(possible)
+                        )
+                    ).all()
+                )
+                if len(existing) < len(possible):
+                    item_title_filter.record_false_positive(
+                        len(possible) - len(existing)
+                    )
+            results: List[Optional[str]] = []
+            rows = []
+            for obj_in in objs_in:
+                if obj_in.title in existing:
+                    results.append("An item with this title already exists.")
+                    continue
+                existing.add(obj_in.title)
+                rows.append({**obj_in.model_dump(), "owner_id": owner_id})
+                results.append(None)
+            if rows:
+                item_stats_repo.apply_delta(session, owner_id=owner_id, delta=len(rows))
+                now = utcnow()
+                seqs = item_change_repo.next_seqs(session, len(rows))
+                for row, seq in zip(rows, seqs):
+                    row["change_seq"] = seq
+                    row["updated_at"] = now
+                if shard_router.enabled:
+                    ids = shard_router.allocate_item_ids(session, owner_id, len(rows))
+                    for row, id in zip(rows, ids):
+                        row["id"] = id
+                session.exec(insert(Item), params=rows)
+                session.commit()
+                item_list_cache.invalidate_owner(owner_id)
+                item_title_filter.add(owner_id, [row["title"] for row in rows])
+        return results
+
+    @traced()
     def update_for_user(
         self,
         db: Session,
@@ -46,28 +154,95 @@ class ItemRepository:
         current_user: User,
     ) -> Item:
         """
-        Updates an item for the current user, first checking for permissions.
+        Updates an item for the current user in a single UPDATE ... RETURNING statement
+        whose WHERE clause enforces ownership. Only when no row matches is the item
+        looked up again, to tell a missing item (404) from someone else's (403).
         """
-        item_to_update = self.get_with_permission(
-            db=db, id=item_id, current_user=current_user
-        )
-        item = self.update(db=db, db_obj=item_to_update, obj_in=obj_in)
-        return item
+        update_data = obj_in.model_dump(exclude_unset=True)
+        if not update_data:
+            return self.get_with_permission(
+                db=db, id=item_id, current_user=current_user
+            )
+        with self._session_for_item(db, item_id, current_user) as session:
+            row = session.exec(
+                update(Item)
+                .where(*self._permission_clauses(item_id, current_user))
+                .values(**update_data, updated_at=utcnow(), change_seq=NEXT_CHANGE_SEQ)
+                .returning(*ITEM_READ_COLUMNS)
+            ).first()
+            if row is None:
+                self._raise_missing_or_forbidden(db, item_id)
+            session.commit()
+        item_list_cache.update_row(row._asdict())
+        if "title" in update_data:
+            item_title_filter.add(row.owner_id, [row.title])
+        return Item(**row._asdict())
 
+    @traced()
     def delete_for_user(self, db: Session, *, item_id: int, current_user: User):
         """
-        Deletes an item for the current user, first checking for permissions.
+        Deletes an item for the current user in a single DELETE ... RETURNING statement
+        whose WHERE clause enforces ownership, with the same 404/403 handling as update_for_user.
         """
-        item_to_delete = self.get_with_permission(
-            db=db, id=item_id, current_user=current_user
-        )
-        item = item_repo.remove(db=db, id=item_to_delete.id)
-        return item
+        with self._session_for_item(db, item_id, current_user) as session:
+            row = session.exec(
+                delete(Item)
+                .where(*self._permission_clauses(item_id, current_user))
+                .returning(*ITEM_READ_COLUMNS, Item.change_seq)
+            ).first()
+            if row is None:
+                self._raise_missing_or_forbidden(db, item_id)
+            item_change_repo.record_delete(
+                session,
+                item_id=row.id,
+                owner_id=row.owner_id,
+                change_seq=row.change_seq,
+            )
+            if row.owner_id is not None:
+                item_stats_repo.apply_delta(session, owner_id=row.owner_id, delta=-1)
+            session.commit()
+        item_list_cache.invalidate_owner(row.owner_id)
+        return Item(**row._asdict())
+
+    def _permission_clauses(self, item_id: int, current_user: User) -> list:
+        """WHERE clauses matching the item only if the current user may modify it."""
+        clauses = [Item.id == item_id]
+        if not current_user.is_superuser:
+            clauses.append(Item.owner_id == current_user.id)
+        return clauses
+
+    @contextmanager
+    def _session_for_item(
+        self, db: Session, item_id: int, current_user: User
+    ) -> Iterator[Session]:
+        """
+        Yields the session an item mutation runs in. A normal user can only modify items
+        on their own shard; a superuser's target shard is found by looking the item up.
+        """
+        owner_id = current_user.id
+        if shard_router.enabled and current_user.is_superuser:
+            item = self.get(db, id=item_id)
+            if not item:
+                raise HTTPException(status_code=404, detail="Item not found")
+            owner_id = item.owner_id
+        with shard_router.session_for_owner(db, owner_id) as session:
+            yield session
 
+    def _raise_missing_or_forbidden(self, db: Session, item_id: int) -> None:
+        """Raises 404 if the item does not exist, 403 if it belongs to someone else."""
+        if self.get(db, id=item_id) is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+        raise HTTPException(status_code=403, detail="Insufficient permission")
+
+    @traced()
     def get(self, db: Session, id: int) -> Optional[Item]:
         """Retrieves a single item from the database by its primary key ID."""
+        if shard_router.enabled:
+            found = shard_router.scatter(lambda session: session.get(Item, id))
+            return next((item for item in found if item is not None), None)
         return db.get(Item, id)
 
+    @traced()
     def get_with_permission(self, db: Session, *, id: int, current_user: User) -> Item:
         """Retrieves an item by ID and verifies the current user has permission (is owner or superuser)."""
         item = self.get(db, id=id)
@@ -77,34 +252,111 @@ class ItemRepository:
             raise HTTPException(status_code=403, detail="Insufficient permission")
         return item
 
+    @traced()
+    def title_exists(self, db: Session, *, title: str, owner_id: int) -> bool:
+        """
+        Whether the owner already has an item with this title. Titles the owner's title
+        filter rules out are answered without a query; only possible hits are looked up.
+        """
+        if not item_title_filter.possible(
+            owner_id,
+            [title],
+            lambda limit: self._load_titles(db, owner_id=owner_id, limit=limit),
+            lambda seq, limit: self._titles_changed_since(
+                db, owner_id=owner_id, seq=seq, limit=limit
+            ),
+        ):
+            return False
+        if self.get_by_title_and_owner(db, title=title, owner_id=owner_id) is None:
+            item_title_filter.record_false_positive()
+            return False
+        return True
+
+    def _load_titles(
+        self, db: Session, *, owner_id: int, limit: int
+    ) -> Tuple[int, List[str]]:
+        """The latest change sequence number, read first, and up to `limit` of the owner's titles."""
+        with shard_router.session_for_owner(db, owner_id) as session:
+            seq = session.exec(select(NEXT_CHANGE_SEQ)).one() - 1
+            titles = session.exec(
+                select(Item.title).where(Item.owner_id == owner_id).limit(limit)
+            ).all()
+        return seq, list(titles)
+
+    def _titles_changed_since(
+        self, db: Session, *, owner_id: int, seq: int, limit: int
+    ) -> Tuple[int, Optional[List[str]]]:
+        """
+        The latest change sequence number and the titles of the owner's items created or
+        updated after `seq`, found through the change_seq index. The titles are None when
+        more than `limit` changes happened since, or the sequence went backwards.
+        """
+        with shard_router.session_for_owner(db, owner_id) as session:
+            latest = session.exec(select(NEXT_CHANGE_SEQ)).one() - 1
+            if latest == seq:
+                return latest, []
+            if latest < seq or latest - seq > limit:
+                return latest, None
+            titles = session.exec(
+                select(Item.title).where(
+                    Item.change_seq > seq, Item.owner_id == owner_id
+                )
+            ).all()
+        return latest, list(titles)
+
+    @traced()
     def get_by_title_and_owner(
         self, db: Session, *, title: str, owner_id: int
     ) -> Optional[Item]:
         """Fetches an item based on its title and the ID of its owner."""
-        return db.exec(
-            select(Item).where(Item.title == title, Item.owner_id == owner_id)
-        ).first()
+        with shard_router.session_for_owner(db, owner_id) as session:
+            return session.exec(
+                select(Item).where(Item.title == title, Item.owner_id == owner_id)
+            ).first()
 
+    @traced()
     def get_multi_by_owner(
         self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100
     ) -> List[Item]:
         """Retrieves all items associated with a specific owner, with options for pagination."""
-        return db.exec(
-            select(Item).where(Item.owner_id == owner_id).offset(skip).limit(limit)
-        ).all()
+        with shard_router.session_for_owner(db, owner_id) as session:
+            return session.exec(
+                select(Item).where(Item.owner_id == owner_id).offset(skip).limit(limit)
+            ).all()
 
+    @traced()
     def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[Item]:
-        """Retrieves a list of all items, with options for pagination."""
-        return db.exec(select(Item).offset(skip).limit(limit)).all()
+        """Retrieves a list of all items, with options for pagination.
+        When sharded, every shard is queried in parallel and the pages are merged by ID."""
+        if shard_router.enabled:
+            return shard_router.gather_sorted(
+                lambda session: session.exec(
+                    select(Item).order_by(Item.id).limit(skip + limit)
+                ).all(),
+                key=lambda item: item.id,
+                skip=skip,
+                limit=limit,
+            )
+        return db.exec(select(Item).order_by(Item.id).offset(skip).limit(limit)).all()
 
+    @traced()
     def create(self, db: Session, *, obj_in: ItemCreate, owner_id: int) -> Item:
         """Creates a new item in the database, assigning it to a specific owner."""
         db_obj = Item(**obj_in.dict(), owner_id=owner_id)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        with shard_router.session_for_owner(db, owner_id) as session:
+            item_stats_repo.apply_delta(session, owner_id=owner_id, delta=1)
+            db_obj.change_seq = item_change_repo.next_seqs(session, 1)[0]
+            db_obj.updated_at = utcnow()
+            if shard_router.enabled:
+                db_obj.id = shard_router.allocate_item_ids(session, owner_id, 1)[0]
+            session.add(db_obj)
+            session.commit()
+            session.refresh(db_obj)
+        item_list_cache.invalidate_owner(owner_id)
+        item_title_filter.add(owner_id, [db_obj.title])
         return db_obj
 
+    @traced()
     def update(self, db: Session, *, db_obj: Item, obj_in: ItemUpdate) -> Item:
         """Updates the attributes of an existing item in the database."""
         if isinstance(obj_in, dict):
@@ -114,17 +366,38 @@ class ItemRepository:
 
         for field, value in update_data.items():
             setattr(db_obj, field, value)
+        db_obj.updated_at = utcnow()
+        # Evaluated inside the UPDATE, so the number is taken under the write lock
+        db_obj.change_seq = NEXT_CHANGE_SEQ
 
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        with shard_router.session_for_owner(db, db_obj.owner_id) as session:
+            session.add(db_obj)
+            session.commit()
+            session.refresh(db_obj)
+        item_list_cache.update_row(
+            {column.key: getattr(db_obj, column.key) for column in ITEM_READ_COLUMNS}
+        )
+        if "title" in update_data:
+            item_title_filter.add(db_obj.owner_id, [db_obj.title])
         return db_obj
 
+    @traced()
     def remove(self, db: Session, *, id: int) -> Item:
         """Deletes a specific item from the database by its ID."""
-        obj = db.get(Item, id)
-        db.delete(obj)
-        db.commit()
+        obj = self.get(db, id)
+        with shard_router.session_for_owner(db, obj.owner_id) as session:
+            session.delete(obj)
+            session.flush()
+            item_change_repo.record_delete(
+                session,
+                item_id=obj.id,
+                owner_id=obj.owner_id,
+                change_seq=obj.change_seq,
+            )
+            if obj.owner_id is not None:
+                item_stats_repo.apply_delta(session, owner_id=obj.owner_id, delta=-1)
+            session.commit()
+        item_list_cache.invalidate_owner(obj.owner_id)
         return obj
 
 
@@ -0,0 +1,244 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, insert
+from sqlmodel import Session, select
+
+from src.core.config import settings
+from src.db.session import engine
+from src.models.models import ItemCacheInvalidation
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+# A cached page: (scope, skip, limit). The scope is an owner ID, or ALL_ITEMS.
+CacheKey = Tuple[Optional[int], int, int]
+
+# Scope of the superuser view of every item, which any item change can affect.
+ALL_ITEMS = None
+
+# Invalidation notices older than this many seconds are pruned.
+_INVALIDATION_RETENTION = 300
+
+
+class ItemListCache:
+    """
+    Bounded LRU cache of item list pages, as ItemRead rows, per owner and for the
+    superuser view of all items. The item repository writes through it: updates replace
+    the changed row in place, creates and deletes drop the owner's pages.
+
+    Each scope has a version that every change bumps. A page loaded while its scope
+    changed is returned but not stored, so a racing read never caches stale rows.
+    """
+
+    def __init__(self) -> None:
+        self._pages: "OrderedDict[CacheKey, List[Row]]" = OrderedDict()
+        self._keys_by_scope: Dict[Optional[int], Set[CacheKey]] = defaultdict(set)
+        self._versions: Dict[Optional[int], int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.rows = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.updates = 0
+        self.origin = uuid.uuid4().hex
+        # Owners changed here whose notices the poll thread has not written yet
+        self._unpublished: Set[int] = set()
+        self._sync_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # Called with the owner ID of every change reported by another process.
+        self.remote_listeners: List[Callable[[int], None]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ITEM_CACHE_MAX_ROWS > 0
+
+    def get_or_load(
+        self, scope: Optional[int], skip: int, limit: int, load: Callable[[], List[Row]]
+    ) -> List[Row]:
+        """Returns the cached page, or loads and caches it. Rows must not be mutated."""
+        if not self.enabled:
+            return load()
+        key = (scope, skip, limit)
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                self.hits += 1
+                return list(page)
+            self.misses += 1
+            version = self._versions[scope]
+
+        page = load()
+        with self._lock:
+            if self._versions[scope] == version and key not in self._pages:
+                self._store(key, page)
+        return list(page)
+
+    def update_row(self, row: Row) -> None:
+        """Replaces a changed item's row, wherever it is cached, with the new one."""
+        with self._lock:
+            for scope in (row["owner_id"], ALL_ITEMS):
+                self._versions[scope] += 1
+                for key in self._keys_by_scope.get(scope, ()):
+                    page = self._pages[key]
+                    for index, cached in enumerate(page):
+                        if cached["id"] == row["id"]:
+                            page[index] = row
+                            self.updates += 1
+        self._publish(row["owner_id"])
+
+    def invalidate_owner(
+        self, owner_id: Optional[int], *, publish: bool = True
+    ) -> None:
+        """Drops every cached page of an owner and of the all-items view."""
+        with self._lock:
+            for scope in (owner_id, ALL_ITEMS):
+                self._versions[scope] += 1
+                for key in self._keys_by_scope.pop(scope, set()):
+                    self.rows -= len(self._pages.pop(key))
+                    self.invalidations += 1
+        if publish:
+            self._publish(owner_id)
+
+    def clear(self) -> None:
+        """Drops every cached page."""
+        with self._lock:
+            for scope in list(self._keys_by_scope):
+                self._versions[scope] += 1
+            self._pages.clear()
+            self._keys_by_scope.clear()
+            self.rows = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, hit rate and eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "pages": len(self._pages),
+                "rows": self.rows,
+                "max_rows": settings.ITEM_CACHE_MAX_ROWS,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "updates": self.updates,
+                "sync": self._sync_thread is not None,
+            }
+
+    def _store(self, key: CacheKey, page: List[Row]) -> None:
+        """Caches a page, evicting least recently used pages until the row budget fits."""
+        if len(page) > settings.ITEM_CACHE_MAX_ROWS:
+            return
+        self._pages[key] = page
+        self._keys_by_scope[key[0]].add(key)
+        self.rows += len(page)
+        while self.rows > settings.ITEM_CACHE_MAX_ROWS:
+            old_key, old_page = self._pages.popitem(last=False)
+            self._keys_by_scope[old_key[0]].discard(old_key)
+            self.rows -= len(old_page)
+            self.evictions += 1
+
+    def _publish(self, owner_id: Optional[int]) -> None:
+        """
+        Queues a notice telling other processes that the owner's item lists changed. The
+        poll thread writes the queued notices in its own transaction, so item writes never
+        wait for a second write lock.
+        """
+        if self._sync_thread is None or owner_id is None:
+            return
+        with self._lock:
+            self._unpublished.add(owner_id)
+
+    def _take_unpublished(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            owners, self._unpublished = self._unpublished, set()
+        now = time.time()
+        return [
+            {"owner_id": owner_id, "origin": self.origin, "created_at": now}
+            for owner_id in owners
+        ]
+
+    def start_sync(self) -> None:
+        """
+        Starts polling the invalidation table every ITEM_CACHE_SYNC_INTERVAL seconds and
+        publishing local changes to it, so other processes see them within two intervals.
+        Does nothing when the interval is 0.
+        """
+        if settings.ITEM_CACHE_SYNC_INTERVAL <= 0 or self._sync_thread is not None:
+            return
+        with Session(engine) as db:
+            last_id = db.exec(select(func.max(ItemCacheInvalidation.id))).one() or 0
+        self._stop.clear()
+        self._sync_thread = threading.Thread(
+            target=self._poll, args=(last_id,), name="item-cache-sync", daemon=True
+        )
+        self._sync_thread.start()
+
+    def stop_sync(self) -> None:
+        """Stops the polling thread."""
+        if self._sync_thread is None:
+            return
+        self._stop.set()
+        self._sync_thread.join()
+        self._sync_thread = None
+
+    def _poll(self, last_id: int) -> None:
+        while not self._stop.wait(settings.ITEM_CACHE_SYNC_INTERVAL):
+            published = self._take_unpublished()
+            try:
+                with Session(engine) as db:
+                    if published:
+                        db.exec(insert(ItemCacheInvalidation), params=published)
+                    max_id = (
+                        db.exec(select(func.max(ItemCacheInvalidation.id))).one() or 0
+                    )
+                    if max_id < last_id:
+                        # IDs were reused after the table emptied; start over from the lowest
+                        last_id = 0
+                    notices = db.exec(
+                        select(
+                            ItemCacheInvalidation.id,
+                            ItemCacheInvalidation.owner_id,
+                            ItemCacheInvalidation.origin,
+                        )
+                        .where(ItemCacheInvalidation.id > last_id)
+                        .order_by(ItemCacheInvalidation.id)
+                    ).all()
+                    db.exec(
+                        delete(ItemCacheInvalidation).where(
+                            ItemCacheInvalidation.created_at
+                            < time.time() - _INVALIDATION_RETENTION,
+                            # The newest notice stays, so its ID is never handed out again
+                            ItemCacheInvalidation.id < max_id,
+                        )
+                    )
+                    db.commit()
+                for id, owner_id, origin in notices:
+                    last_id = id
+                    if origin != self.origin:
+                        self.invalidate_owner(owner_id, publish=False)
+                        for listener in self.remote_listeners:
+                            listener(owner_id)
+            except Exception:
+                with self._lock:
+                    self._unpublished.update(row["owner_id"] for row in published)
+                logger.exception("Polling item cache invalidations failed.")
+        # Changes made since the last poll
+        published = self._take_unpublished()
+        if published:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(ItemCacheInvalidation), published)
+            except Exception:
+                # Other processes then serve stale lists until their pages are evicted
+                logger.exception("Publishing item cache invalidations failed.")
+
+
+item_list_cache = ItemListCache()
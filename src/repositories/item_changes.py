@@ -0,0 +1,235 @@
+import heapq
+import itertools
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, union_all, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from src.core.tracing import traced
+from src.db.shards import shard_router
+from src.models.models import (
+    Item,
+    ItemChangeHorizon,
+    ItemChangeRead,
+    ItemChangesPage,
+    ItemRead,
+    ItemTombstone,
+    User,
+)
+
+_ITEM_COLUMNS = [getattr(Item, name) for name in ItemRead.model_fields]
+
+_latest = union_all(
+    select(func.max(Item.change_seq).label("seq")),
+    select(func.max(ItemTombstone.change_seq).label("seq")),
+).subquery()
+
+# The next change sequence number of a database: one past the highest number used by any
+# item or tombstone. Both columns are indexed, so this costs two index lookups. Evaluate it
+# only after the transaction has written, so SQLite's write lock keeps the number exclusive
+# and changes commit in sequence order.
+NEXT_CHANGE_SEQ = (
+    select(func.coalesce(func.max(_latest.c.seq), 0) + 1)
+).scalar_subquery()
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ItemChangeRepository:
+    def next_seqs(self, db: Session, count: int) -> range:
+        """Reserves `count` consecutive change sequence numbers for the running write transaction."""
+        first = db.exec(select(NEXT_CHANGE_SEQ)).one()
+        return range(first, first + count)
+
+    def record_delete(
+        self,
+        db: Session,
+        *,
+        item_id: int,
+        owner_id: Optional[int],
+        change_seq: Optional[int],
+    ) -> None:
+        """
+        Writes the tombstone of an item deleted in the running transaction. `change_seq` is the
+        deleted row's own number; the tombstone always sorts after it, even when the deleted
+        row held the highest number.
+        """
+        seq = max(self.next_seqs(db, 1)[0], (change_seq or 0) + 1)
+        db.exec(
+            insert(ItemTombstone)
+            .prefix_with("OR REPLACE")
+            .values(
+                item_id=item_id, owner_id=owner_id, change_seq=seq, deleted_at=utcnow()
+            )
+        )
+
+    @traced()
+    def get_changes_for_user(
+        self, db: Session, *, current_user: User, since: Optional[str], limit: int
+    ) -> ItemChangesPage:
+        """
+        Returns the item inserts, updates and deletes after the cursor `since`, oldest first:
+        all items' changes for a superuser, only their own for a normal user. An item
+        changed several times since the cursor appears once, in its latest state.
+
+        Change sequences are per database, so with sharding the cursor holds one position
+        per shard and a page is filled from the shards in order.
+        """
+        owner_id = None if current_user.is_superuser else current_user.id
+        positions = self._parse_cursor(since)
+
+        if not shard_router.enabled:
+            pages = [self._read_changes(db, owner_id, positions[0], limit)]
+        elif owner_id is None:
+            pages = shard_router.map_shards(
+                lambda shard, session: self._read_changes(
+                    session, owner_id, positions[shard], limit
+                )
+            )
+        else:
+            shard = shard_router.shard_for_owner(owner_id)
+            pages = [[] for _ in positions]
+            with shard_router.session_for_owner(db, owner_id) as session:
+                pages[shard] = self._read_changes(
+                    session, owner_id, positions[shard], limit
+                )
+
+        changes: List[ItemChangeRead] = []
+        has_more = False
+        for shard, page in enumerate(pages):
+            taken = page[: max(limit - len(changes), 0)]
+            if taken:
+                positions[shard] = taken[-1].change_seq
+            changes.extend(taken)
+            has_more = has_more or len(page) > len(taken)
+        return ItemChangesPage(
+            changes=changes,
+            cursor=".".join(str(position) for position in positions),
+            has_more=has_more,
+        )
+
+    @traced()
+    def prune_tombstones(self, db: Session, *, before: datetime) -> int:
+        """
+        Deletes the tombstones of items deleted before `before` and raises the database's
+        horizon to the highest number deleted, so cursors that could have missed those
+        deletes get a 410. The newest tombstone is always kept: it may hold the highest
+        change sequence number, which must never be handed out again.
+        Returns the number of tombstones deleted.
+        """
+        newest = db.exec(select(func.max(ItemTombstone.change_seq))).one()
+        if newest is None:
+            return 0
+        horizon = db.exec(
+            select(func.max(ItemTombstone.change_seq)).where(
+                ItemTombstone.deleted_at < before, ItemTombstone.change_seq < newest
+            )
+        ).one()
+        if horizon is None:
+            return 0
+        db.exec(
+            sqlite_insert(ItemChangeHorizon)
+            .values(id=1, pruned_seq=horizon)
+            .on_conflict_do_update(
+                index_elements=[ItemChangeHorizon.id],
+                set_={"pruned_seq": func.max(ItemChangeHorizon.pruned_seq, horizon)},
+            )
+        )
+        result = db.exec(
+            delete(ItemTombstone).where(ItemTombstone.change_seq <= horizon)
+        )
+        db.commit()
+        return result.rowcount
+
+    @traced()
+    def backfill(self, db: Session) -> int:
+        """
+        Gives items without a change sequence number (rows written before the change feed
+        existed, or loaded in bulk) numbers after every existing one, in ID order. Run it
+        while nothing else writes items. Returns the number of items updated.
+        """
+        first_id = db.exec(
+            select(func.min(Item.id)).where(Item.change_seq.is_(None))
+        ).one()
+        if first_id is None:
+            return 0
+        offset = self.next_seqs(db, 1)[0] - first_id
+        result = db.exec(
+            update(Item)
+            .where(Item.change_seq.is_(None))
+            .values(change_seq=Item.id + offset)
+        )
+        db.commit()
+        return result.rowcount
+
+    def _read_changes(
+        self, db: Session, owner_id: Optional[int], since: int, limit: int
+    ) -> List[ItemChangeRead]:
+        """
+        Reads up to limit + 1 changes after `since` from one database, by sequence number.
+        Raises 410 when deletes after `since` may have been pruned.
+        """
+        if since:
+            horizon = db.get(ItemChangeHorizon, 1)
+            if horizon is not None and since < horizon.pruned_seq:
+                raise HTTPException(
+                    status_code=410,
+                    detail="The change cursor is older than the retained deletes. Sync again from the start.",
+                )
+        items = select(*_ITEM_COLUMNS, Item.change_seq, Item.updated_at).where(
+            Item.change_seq > since
+        )
+        tombstones = select(ItemTombstone).where(ItemTombstone.change_seq > since)
+        if owner_id is not None:
+            items = items.where(Item.owner_id == owner_id)
+            tombstones = tombstones.where(ItemTombstone.owner_id == owner_id)
+
+        upserts = (
+            ItemChangeRead(
+                op="upsert",
+                id=row.id,
+                change_seq=row.change_seq,
+                changed_at=row.updated_at,
+                item=ItemRead(
+                    **{name: getattr(row, name) for name in ItemRead.model_fields}
+                ),
+            )
+            for row in db.exec(items.order_by(Item.change_seq).limit(limit + 1)).all()
+        )
+        deletes = (
+            ItemChangeRead(
+                op="delete",
+                id=tombstone.item_id,
+                change_seq=tombstone.change_seq,
+                changed_at=tombstone.deleted_at,
+            )
+            for tombstone in db.exec(
+                tombstones.order_by(ItemTombstone.change_seq).limit(limit + 1)
+            ).all()
+        )
+        merged = heapq.merge(upserts, deletes, key=lambda change: change.change_seq)
+        return list(itertools.islice(merged, limit + 1))
+
+    def _parse_cursor(self, since: Optional[str]) -> List[int]:
+        """Splits a cursor into one position per database; an empty cursor starts from the beginning."""
+        count = max(shard_router.count, 1)
+        if not since:
+            return [0] * count
+        try:
+            positions = [int(part) for part in since.split(".")]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid change cursor.")
+        if len(positions) != count:
+            raise HTTPException(
+                status_code=410,
+                detail="The change cursor belongs to a different shard layout. Sync again from the start.",
+            )
+        return positions
+
+
+item_change_repo = ItemChangeRepository()
@@ -0,0 +1,96 @@
+from typing import List, Optional
+from sqlalchemy import func, insert, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+from src.core.tracing import traced
+from src.db.shards import shard_router
+from src.models.models import Item, ItemStats, User
+
+
+class ItemStatsRepository:
+    @traced()
+    def get_for_user(
+        self, db: Session, *, current_user: User, skip: int = 0, limit: int = 100
+    ) -> List[ItemStats]:
+        """
+        Retrieves the statistics of all owners for a superuser, or only the current user's own.
+        """
+        if current_user.is_superuser:
+            return self.get_multi(db, skip=skip, limit=limit)
+        stats = self.get(db, owner_id=current_user.id)
+        return [stats or ItemStats(owner_id=current_user.id, item_count=0)]
+
+    def get(self, db: Session, *, owner_id: int) -> Optional[ItemStats]:
+        """Retrieves the statistics row of one owner by primary key, from the owner's shard."""
+        with shard_router.session_for_owner(db, owner_id) as session:
+            return session.get(ItemStats, owner_id)
+
+    @traced()
+    def get_multi(
+        self, db: Session, *, skip: int = 0, limit: int = 100
+    ) -> List[ItemStats]:
+        """Retrieves the statistics of all owners, with options for pagination."""
+        if shard_router.enabled:
+            return shard_router.gather_sorted(
+                lambda session: session.exec(
+                    select(ItemStats).order_by(ItemStats.owner_id).limit(skip + limit)
+                ).all(),
+                key=lambda stats: stats.owner_id,
+                skip=skip,
+                limit=limit,
+            )
+        return db.exec(
+            select(ItemStats).order_by(ItemStats.owner_id).offset(skip).limit(limit)
+        ).all()
+
+    def apply_delta(self, db: Session, *, owner_id: int, delta: int) -> None:
+        """
+        Adjusts an owner's item count inside the caller's transaction. Does not commit,
+        so the change lands atomically with the item insert or delete that caused it.
+        A single upsert, so two first writes for the same owner cannot both insert.
+        """
+        db.exec(
+            sqlite_insert(ItemStats)
+            .values(owner_id=owner_id, item_count=max(delta, 0))
+            .on_conflict_do_update(
+                index_elements=[ItemStats.owner_id],
+                set_={"item_count": ItemStats.item_count + delta},
+            )
+        )
+
+    @traced()
+    def reconcile(self, db: Session) -> int:
+        """
+        Recomputes every owner's item count from the item table of the session's database
+        (one shard when sharded) and fixes rows that drifted. Returns the number of owners whose statistics were corrected.
+        Runs in SQL under BEGIN IMMEDIATE, so no item write can commit between counting and correcting.
+        Expects a session without an open transaction.
+        """
+        db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+        actual = (
+            select(func.count())
+            .select_from(Item)
+            .where(Item.owner_id == ItemStats.owner_id)
+            .scalar_subquery()
+        )
+        fixed = db.exec(
+            update(ItemStats)
+            .where(ItemStats.item_count != actual)
+            .values(item_count=actual)
+        ).rowcount
+        fixed += db.exec(
+            insert(ItemStats).from_select(
+                ["owner_id", "item_count"],
+                select(Item.owner_id, func.count())
+                .where(
+                    Item.owner_id.is_not(None),
+                    Item.owner_id.not_in(select(ItemStats.owner_id)),
+                )
+                .group_by(Item.owner_id),
+            )
+        ).rowcount
+        db.commit()
+        return fixed
+
+
+item_stats_repo = ItemStatsRepository()
@@ -0,0 +1,261 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core.config import settings
+from src.repositories.item_cache import item_list_cache
+
+# Bloom filter shape: about 1% false positives at full capacity.
+_BITS_PER_TITLE = 10
+_HASHES = 7
+# Filters are built with room for this many times the owner's current titles.
+_HEADROOM = 2
+_MIN_CAPACITY = 64
+_MASK64 = (1 << 64) - 1
+# A filter more changes behind the database than this is rebuilt instead of caught up.
+_MAX_CATCH_UP = 10000
+
+
+class _TitleBloom:
+    """Bloom filter of one owner's titles. Titles cannot be removed; they go stale."""
+
+    __slots__ = ("bits", "size", "capacity", "count", "seq")
+
+    def __init__(self, capacity: int, seq: int) -> None:
+        self.capacity = capacity
+        # Change sequence number of the owner's database that the filter is current with
+        self.seq = seq
+        self.size = capacity * _BITS_PER_TITLE
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, title: str) -> Iterable[int]:
+        digest = hash(title) & _MASK64
+        first, step = digest & 0xFFFFFFFF, (digest >> 32) | 1
+        return ((first + i * step) % self.size for i in range(_HASHES))
+
+    def add(self, title: str) -> None:
+        for position in self._positions(title):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, title: str) -> bool:
+        bits = self.bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(title)
+        )
+
+
+class ItemTitleFilter:
+    """
+    Per-owner Bloom filters of item titles, so a create can skip the duplicate-title query
+    when the title is definitely new. Only titles the filter may contain are checked
+    against the database. Filters are built lazily from the owner's items and kept in an
+    LRU within ITEM_TITLE_FILTER_MAX_BYTES.
+
+    The item repository adds the titles it writes. Before a filter's "definitely new" is
+    trusted, it catches up with the titles the owner's items got after the change sequence
+    number it is current with (an indexed read of the newest changes), so items written by
+    other processes are not missed. A filter too far behind is rebuilt. Rows inserted
+    without a change sequence number (raw script loads before their backfill) are only
+    seen by filters built after them.
+    Deleted and renamed titles stay in the filter and only cost false positives. A filter
+    that outgrows its capacity is dropped and rebuilt on its next use, which also clears
+    those stale titles.
+    """
+
+    def __init__(self) -> None:
+        self._filters: "OrderedDict[int, _TitleBloom]" = OrderedDict()
+        # Titles added while an owner's filter is being loaded; None once the load is stale.
+        self._building: Dict[int, Optional[List[str]]] = {}
+        # Owners with too many titles for the budget; their checks always query.
+        self._oversized: Set[int] = set()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.lookups = 0
+        self.skipped = 0
+        self.possible_hits = 0
+        self.false_positives = 0
+        self.builds = 0
+        self.catch_ups = 0
+        self.caught_up_titles = 0
+        self.stale = 0
+        self.overflows = 0
+        self.evictions = 0
+        item_list_cache.remote_listeners.append(self.forget_owner)
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ITEM_TITLE_FILTER_MAX_BYTES > 0
+
+    def possible(
+        self,
+        owner_id: int,
+        titles: List[str],
+        load: Callable[[int], Tuple[int, List[str]]],
+        changes: Callable[[int, int], Tuple[int, Optional[List[str]]]],
+    ) -> List[str]:
+        """
+        Returns the titles that may already exist for the owner; the others definitely do
+        not. `load(limit)` returns the database's latest change sequence number, read
+        first, and up to `limit` of the owner's titles, to build a filter.
+        `changes(seq, limit)` returns the latest change sequence number and the owner's
+        titles written after `seq`, or None for them if more than `limit` changes happened.
+        """
+        if not self.enabled:
+            return titles
+        with self._lock:
+            self.lookups += len(titles)
+            bloom = self._filters.get(owner_id)
+            if bloom is not None:
+                self._filters.move_to_end(owner_id)
+                if all(title in bloom for title in titles):
+                    return self._check(bloom, titles)
+                seq = bloom.seq
+            elif owner_id in self._building or owner_id in self._oversized:
+                return titles
+            else:
+                self._building[owner_id] = []
+        if bloom is None:
+            return self._build(owner_id, titles, load)
+
+        latest, changed = changes(seq, _MAX_CATCH_UP)
+        with self._lock:
+            self.catch_ups += 1
+            if self._filters.get(owner_id) is not bloom:
+                return titles
+            if changed is None:
+                self._drop(owner_id)
+                self.stale += 1
+                return titles
+            for title in changed:
+                if title not in bloom:
+                    bloom.add(title)
+                    self.caught_up_titles += 1
+            bloom.seq = max(bloom.seq, latest)
+            possible = self._check(bloom, titles)
+            if bloom.count > bloom.capacity:
+                self._drop(owner_id)
+                self.overflows += 1
+            return possible
+
+    def _build(
+        self,
+        owner_id: int,
+        titles: List[str],
+        load: Callable[[int], Tuple[int, List[str]]],
+    ) -> List[str]:
+        max_titles = settings.ITEM_TITLE_FILTER_MAX_BYTES * 8 // _BITS_PER_TITLE
+        max_titles //= _HEADROOM
+        try:
+            seq, loaded = load(max_titles + 1)
+        except BaseException:
+            with self._lock:
+                del self._building[owner_id]
+            raise
+        # One critical section from taking the pending titles to storing the filter, so no
+        # add() falls between them
+        with self._lock:
+            pending = self._building.pop(owner_id)
+            if len(loaded) > max_titles:
+                self._oversized.add(owner_id)
+                return titles
+            if pending is None:
+                return titles
+            loaded.extend(pending)
+            bloom = _TitleBloom(max(_MIN_CAPACITY, len(loaded) * _HEADROOM), seq)
+            for title in loaded:
+                bloom.add(title)
+            self.builds += 1
+            self._store(owner_id, bloom)
+            return self._check(bloom, titles)
+
+    def add(self, owner_id: Optional[int], titles: List[str]) -> None:
+        """Records titles written for the owner."""
+        if owner_id is None:
+            return
+        with self._lock:
+            pending = self._building.get(owner_id)
+            if pending is not None:
+                pending.extend(titles)
+            bloom = self._filters.get(owner_id)
+            if bloom is None:
+                return
+            for title in titles:
+                bloom.add(title)
+            if bloom.count > bloom.capacity:
+                self._drop(owner_id)
+                self.overflows += 1
+
+    def record_false_positive(self, count: int = 1) -> None:
+        """Counts possible hits that the database showed were new titles."""
+        with self._lock:
+            self.false_positives += count
+
+    def forget_owner(self, owner_id: Optional[int]) -> None:
+        """Drops an owner's filter, for item changes this process did not see."""
+        with self._lock:
+            if owner_id in self._building:
+                self._building[owner_id] = None
+            self._oversized.discard(owner_id)
+            if owner_id in self._filters:
+                self._drop(owner_id)
+
+    def clear(self) -> None:
+        """Drops every filter."""
+        with self._lock:
+            for owner_id in self._building:
+                self._building[owner_id] = None
+            self._filters.clear()
+            self._oversized.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, skipped queries and false-positive and eviction counters."""
+        with self._lock:
+            negatives = self.skipped + self.false_positives
+            return {
+                "owners": len(self._filters),
+                "titles": sum(bloom.count for bloom in self._filters.values()),
+                "bytes": self.bytes,
+                "max_bytes": settings.ITEM_TITLE_FILTER_MAX_BYTES,
+                "oversized_owners": len(self._oversized),
+                "lookups": self.lookups,
+                "skipped_queries": self.skipped,
+                "possible_hits": self.possible_hits,
+                "false_positives": self.false_positives,
+                "false_positive_rate": round(self.false_positives / negatives, 4)
+                if negatives
+                else 0.0,
+                "builds": self.builds,
+                "catch_ups": self.catch_ups,
+                "caught_up_titles": self.caught_up_titles,
+                "stale_rebuilds": self.stale,
+                "overflows": self.overflows,
+                "evictions": self.evictions,
+            }
+
+    def _check(self, bloom: _TitleBloom, titles: List[str]) -> List[str]:
+        possible = [title for title in titles if title in bloom]
+        self.possible_hits += len(possible)
+        self.skipped += len(titles) - len(possible)
+        return possible
+
+    def _store(self, owner_id: int, bloom: _TitleBloom) -> None:
+        """Keeps a filter, evicting least recently used ones until the byte budget fits."""
+        size = len(bloom.bits)
+        if size > settings.ITEM_TITLE_FILTER_MAX_BYTES:
+            return
+        self._filters[owner_id] = bloom
+        self.bytes += size
+        while self.bytes > settings.ITEM_TITLE_FILTER_MAX_BYTES:
+            _, old = self._filters.popitem(last=False)
+            self.bytes -= len(old.bits)
+            self.evictions += 1
+
+    def _drop(self, owner_id: int) -> None:
+        self.bytes -= len(self._filters.pop(owner_id).bits)
+
+
+item_title_filter = ItemTitleFilter()
@@ -1,11 +1,14 @@
 from fastapi import HTTPException
-from typing import Optional
+from typing import Iterable, List, Optional, Set
+from sqlalchemy import insert
 from sqlmodel import Session, select
 from src.core.security import get_password_hash, verify_password
+from src.core.tracing import traced
 from src.models.models import User, UserCreate
 
 
 class UserRepository:
+    @traced()
     def register(self, db: Session, *, obj_in: UserCreate) -> User:
         """Creates a new user if the email is not already in use."""
         user = self.get_by_email(db, email=obj_in.email)
@@ -16,10 +19,12 @@ class UserRepository:
             )
         return self.create(db, obj_in=obj_in)
 
+    @traced()
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         """Finds and returns a user by their email address."""
         return db.exec(select(User).where(User.email == email)).first()
 
+    @traced()
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
         """Creates a new user record in the database,
         hashing the provided password for storage."""
@@ -34,6 +39,37 @@ class UserRepository:
         db.refresh(db_obj)
         return db_obj
 
+    @traced()
+    def get_existing_emails(self, db: Session, *, emails: Iterable[str]) -> Set[str]:
+        """Returns which of the given email addresses already belong to a user, in one query."""
+        return set(db.exec(select(User.email).where(User.email.in_(set(emails)))).all())
+
+    @traced()
+    def create_many(
+        self, db: Session, *, objs_in: List[UserCreate], hashed_passwords: List[str]
+    ) -> List[int]:
+        """Inserts a batch of users whose passwords are already hashed with a single
+        executemany, and returns their IDs in input order. Raises IntegrityError if an
+        email is taken, so check with get_existing_emails first."""
+        if not objs_in:
+            return []
+        rows = [
+            {
+                **obj_in.model_dump(exclude={"password"}),
+                "hashed_password": hashed_password,
+            }
+            for obj_in, hashed_password in zip(objs_in, hashed_passwords)
+        ]
+        ids = list(
+            db.exec(
+                insert(User).returning(User.id, sort_by_parameter_order=True),
+                params=rows,
+            ).scalars()
+        )
+        db.commit()
+        return ids
+
+    @traced()
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         """Validates a user's credentials by checking their email and verifying their password."""
         user = self.get_by_email(db, email=email)
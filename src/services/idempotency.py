@@ -0,0 +1,280 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import IO, Any, Callable, Dict, Optional
+
+import orjson
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, insert
+from sqlmodel import Session
+
+from src.core.config import settings
+from src.db.session import engine
+from src.models import IdempotencyRecord
+
+logger = logging.getLogger(__name__)
+
+# Header set on responses replayed from the store.
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+@dataclass
+class StoredResponse:
+    """A completed response, kept to answer retries of the request that produced it."""
+
+    fingerprint: str
+    status_code: int
+    body: bytes
+    expires_at: float
+    headers: Optional[Dict[str, str]] = None
+
+
+@dataclass
+class _InFlight:
+    """A request whose key is claimed but whose response is not stored yet."""
+
+    fingerprint: str
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+def fingerprint(*parts: bytes) -> str:
+    """Digest of a request's content, compared with the content of retries using its key."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def fingerprint_upload(filename: Optional[str], upload: IO[bytes]) -> str:
+    """Fingerprints an uploaded file by its name and content, then rewinds it."""
+    digest = hashlib.sha256((filename or "").encode())
+    for chunk in iter(lambda: upload.read(1024 * 1024), b""):
+        digest.update(chunk)
+    upload.seek(0)
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Replays the response of a request sent with an Idempotency-Key to retries that reuse
+    the key, so a retried create never runs twice. Keys are scoped to the endpoint and the
+    user. A retry that arrives while the original is still running waits for its response
+    (up to IDEMPOTENCY_WAIT_SECONDS) instead of running alongside it. Reusing a key for a
+    request with different content is rejected with 422.
+
+    Responses are kept for IDEMPOTENCY_TTL_SECONDS in an LRU of IDEMPOTENCY_MAX_KEYS
+    entries, and with IDEMPOTENCY_PERSIST also in the database, where other processes
+    find them. Only completed responses are shared between processes; a retry reaching
+    another process while the original runs is handled there as a new request.
+    Server errors are not stored, so the request can be retried. Client errors are stored
+    with their headers (such as WWW-Authenticate), which replays repeat.
+    """
+
+    def __init__(self) -> None:
+        self._responses: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.replays = 0
+        self.coalesced = 0
+        self.mismatches = 0
+        self.timeouts = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def run(
+        self,
+        *,
+        key: Optional[str],
+        scope: str,
+        user_id: int,
+        request_fingerprint: str,
+        call: Callable[[], Any],
+        status_code: int = 200,
+    ) -> Any:
+        """
+        Runs `call` once per key and returns its result as a JSON response, or replays the
+        response stored for the key. Without a key, `call`'s result is returned as is.
+        """
+        if key is None:
+            return call()
+        store_key = f"{scope}:{user_id}:{key}"
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            stored = self._lookup(store_key)
+            with self._lock:
+                stored = stored or self._get(store_key)
+                if stored is not None:
+                    return self._replay(stored, request_fingerprint)
+                flight = self._in_flight.get(store_key)
+                if flight is None:
+                    flight = self._in_flight[store_key] = _InFlight(request_fingerprint)
+                    break
+                self._check_fingerprint(flight.fingerprint, request_fingerprint)
+                self.coalesced += 1
+            if not flight.done.wait(max(deadline - time.monotonic(), 0)):
+                with self._lock:
+                    self.timeouts += 1
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still being processed.",
+                )
+
+        stored = None
+        try:
+            try:
+                body = orjson.dumps(jsonable_encoder(call()))
+                stored = self._completed(request_fingerprint, status_code, body)
+            except HTTPException as e:
+                if e.status_code < 500:
+                    stored = self._completed(
+                        request_fingerprint,
+                        e.status_code,
+                        orjson.dumps({"detail": e.detail}),
+                        e.headers,
+                    )
+                raise
+        finally:
+            with self._lock:
+                if stored is not None:
+                    self._put(store_key, stored)
+                del self._in_flight[store_key]
+            flight.done.set()
+            if stored is not None and settings.IDEMPOTENCY_PERSIST:
+                self._persist(store_key, stored)
+        return Response(
+            content=stored.body, status_code=status_code, media_type="application/json"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Stored keys, replays and coalesced retries."""
+        with self._lock:
+            return {
+                "keys": len(self._responses),
+                "max_keys": settings.IDEMPOTENCY_MAX_KEYS,
+                "in_flight": len(self._in_flight),
+                "persist": settings.IDEMPOTENCY_PERSIST,
+                "stored": self.stored,
+                "replays": self.replays,
+                "coalesced": self.coalesced,
+                "mismatches": self.mismatches,
+                "timeouts": self.timeouts,
+                "expired": self.expired,
+                "evictions": self.evictions,
+            }
+
+    def clear(self) -> None:
+        """Forgets every stored response of this process."""
+        with self._lock:
+            self._responses.clear()
+
+    def _completed(
+        self,
+        request_fingerprint: str,
+        status_code: int,
+        body: bytes,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> StoredResponse:
+        return StoredResponse(
+            fingerprint=request_fingerprint,
+            status_code=status_code,
+            body=body,
+            expires_at=time.time() + settings.IDEMPOTENCY_TTL_SECONDS,
+            headers=dict(headers) if headers else None,
+        )
+
+    def _replay(self, stored: StoredResponse, request_fingerprint: str) -> Response:
+        self._check_fingerprint(stored.fingerprint, request_fingerprint)
+        self.replays += 1
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type="application/json",
+            headers={**(stored.headers or {}), REPLAYED_HEADER: "true"},
+        )
+
+    def _check_fingerprint(self, expected: str, request_fingerprint: str) -> None:
+        if expected != request_fingerprint:
+            self.mismatches += 1
+            raise HTTPException(
+                status_code=422,
+                detail="This Idempotency-Key was used for a different request.",
+            )
+
+    def _get(self, store_key: str) -> Optional[StoredResponse]:
+        stored = self._responses.get(store_key)
+        if stored is None:
+            return None
+        if stored.expires_at <= time.time():
+            del self._responses[store_key]
+            self.expired += 1
+            return None
+        self._responses.move_to_end(store_key)
+        return stored
+
+    def _put(self, store_key: str, stored: StoredResponse) -> None:
+        """Keeps a response, evicting the least recently used ones beyond IDEMPOTENCY_MAX_KEYS."""
+        self._responses[store_key] = stored
+        self._responses.move_to_end(store_key)
+        self.stored += 1
+        while len(self._responses) > settings.IDEMPOTENCY_MAX_KEYS:
+            self._responses.popitem(last=False)
+            self.evictions += 1
+
+    def _lookup(self, store_key: str) -> Optional[StoredResponse]:
+        """Finds a response another process stored, when it is not held in memory."""
+        if not settings.IDEMPOTENCY_PERSIST:
+            return None
+        with self._lock:
+            if store_key in self._responses:
+                return None
+        try:
+            with Session(engine) as db:
+                record = db.get(IdempotencyRecord, store_key)
+        except Exception:
+            logger.exception("Reading a stored idempotent response failed.")
+            return None
+        if record is None or record.expires_at <= time.time():
+            return None
+        return StoredResponse(
+            fingerprint=record.fingerprint,
+            status_code=record.status_code,
+            body=record.body.encode(),
+            expires_at=record.expires_at,
+            headers=orjson.loads(record.headers) if record.headers else None,
+        )
+
+    def _persist(self, store_key: str, stored: StoredResponse) -> None:
+        """Writes a response to the database and prunes expired ones."""
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    insert(IdempotencyRecord)
+                    .prefix_with("OR REPLACE")
+                    .values(
+                        key=store_key,
+                        fingerprint=stored.fingerprint,
+                        status_code=stored.status_code,
+                        body=stored.body.decode(),
+                        headers=orjson.dumps(stored.headers).decode()
+                        if stored.headers
+                        else None,
+                        expires_at=stored.expires_at,
+                    )
+                )
+                conn.execute(
+                    delete(IdempotencyRecord).where(
+                        IdempotencyRecord.expires_at < time.time()
+                    )
+                )
+        except Exception:
+            # Retries reaching other processes then run as new requests
+            logger.exception("Storing an idempotent response failed.")
+
+
+idempotency_store = IdempotencyStore()
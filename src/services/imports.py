@@ -0,0 +1,192 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from src.core.config import settings
+from src.models import User
+
+SUPPORTED_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+@dataclass
+class RowError:
+    """A single rejected row of an import file (1-based data row number)."""
+
+    row: int
+    error: str
+
+
+@dataclass
+class ImportJob:
+    """Tracks the progress of a file import running in the background."""
+
+    id: str
+    kind: str
+    owner_id: int
+    filename: str
+    total_bytes: int
+    status: str = "pending"  # pending -> running -> completed | failed
+    bytes_read: int = 0
+    rows_processed: int = 0
+    rows_imported: int = 0
+    error_count: int = 0
+    errors: List[RowError] = field(default_factory=list)
+    detail: Optional[str] = None
+    # Per-row result file written by imports that produce one (see user imports).
+    result_path: Optional[str] = None
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the file consumed so far, between 0 and 1."""
+        if self.status == "completed":
+            return 1.0
+        if not self.total_bytes:
+            return 0.0
+        return min(self.bytes_read / self.total_bytes, 1.0)
+
+    def add_error(self, row: int, error: str) -> None:
+        """Records a rejected row, keeping at most IMPORT_MAX_REPORTED_ERRORS of them."""
+        self.error_count += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(row=row, error=error))
+
+
+class ImportJobRegistry:
+    """In-memory registry of recent import jobs, bounded to IMPORT_MAX_JOBS entries."""
+
+    def __init__(self) -> None:
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(
+        self, *, kind: str, owner_id: int, filename: str, total_bytes: int
+    ) -> ImportJob:
+        """Registers a new pending job, dropping the oldest jobs once the registry is full."""
+        job = ImportJob(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            owner_id=owner_id,
+            filename=filename,
+            total_bytes=total_bytes,
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > settings.IMPORT_MAX_JOBS:
+                _, dropped = self._jobs.popitem(last=False)
+                if dropped.result_path:
+                    remove_spool(dropped.result_path)
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        """Returns a job by its ID, or None if it is unknown or has been dropped."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_for_user(self, job_id: str, *, current_user: User) -> ImportJob:
+        """Returns a job the current user may see (their own, or any for superusers)."""
+        job = self.get(job_id)
+        if not job or (
+            not current_user.is_superuser and job.owner_id != current_user.id
+        ):
+            raise HTTPException(status_code=404, detail="Import job not found")
+        return job
+
+
+def detect_format(filename: Optional[str]) -> str:
+    """Maps an upload's file extension to a supported import format."""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported file type. Upload a .csv, .ndjson or .jsonl file.",
+        )
+    return SUPPORTED_FORMATS[extension]
+
+
+def new_spool_path() -> str:
+    """Reserves a temporary file that holds an upload until its import job has run."""
+    fd, path = tempfile.mkstemp(prefix="import-", suffix=".upload")
+    os.close(fd)
+    return path
+
+
+def spool_upload(source: IO[bytes]) -> Tuple[str, int]:
+    """
+    Copies an uploaded file to a temporary path in fixed-size chunks, so it outlives
+    the request that received it. Returns the path and the file size in bytes.
+    """
+    path = new_spool_path()
+    with open(path, "wb") as target:
+        shutil.copyfileobj(source, target, length=1024 * 1024)
+    return path, os.path.getsize(path)
+
+
+def iter_records(
+    raw: IO[bytes], fmt: str
+) -> Iterator[Tuple[int, Dict[str, Any] | Exception]]:
+    """
+    Lazily yields (row number, record) pairs from a binary CSV or NDJSON stream.
+    A row that cannot be parsed is yielded as the exception instead of stopping the import.
+    """
+    text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        row = 0
+        while True:
+            row += 1
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield row, e
+                continue
+            if None in record:
+                yield row, ValueError("Row has more fields than the header.")
+                continue
+            yield row, record
+    else:
+        row = 0
+        for line in text:
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row, e
+                continue
+            if not isinstance(record, dict):
+                yield row, ValueError("Each line must be a JSON object.")
+                continue
+            yield row, record
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """Flattens a pydantic ValidationError into a single readable line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+def remove_spool(path: str) -> None:
+    """Deletes a spooled upload, or result file, once its job is done with it."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+import_jobs = ImportJobRegistry()
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from nicegui import run
+
+from src.core.config import settings
+from src.db.session import get_db_context
+from src.db.shards import shard_router
+from src.repositories.item_changes import item_change_repo, utcnow
+
+logger = logging.getLogger(__name__)
+
+
+def prune_item_tombstones() -> int:
+    """Deletes tombstones past ITEM_TOMBSTONE_RETENTION_DAYS and returns how many were deleted."""
+    before = utcnow() - timedelta(days=settings.ITEM_TOMBSTONE_RETENTION_DAYS)
+    if shard_router.enabled:
+        return sum(
+            shard_router.scatter(
+                lambda db: item_change_repo.prune_tombstones(db, before=before)
+            )
+        )
+    with get_db_context() as db:
+        return item_change_repo.prune_tombstones(db, before=before)
+
+
+async def prune_item_tombstones_periodically() -> None:
+    """
+    Prunes expired tombstones once at startup, then every ITEM_TOMBSTONE_PRUNE_INTERVAL
+    seconds, in a worker thread. Does nothing when ITEM_TOMBSTONE_RETENTION_DAYS is 0.
+    """
+    if settings.ITEM_TOMBSTONE_RETENTION_DAYS <= 0:
+        return
+    while True:
+        try:
+            pruned = await run.io_bound(prune_item_tombstones)
+            if pruned:
+                logger.info("Pruned %s item tombstones.", pruned)
+        except Exception:
+            logger.exception("Pruning item tombstones failed.")
+        if settings.ITEM_TOMBSTONE_PRUNE_INTERVAL <= 0:
+            return
+        await asyncio.sleep(settings.ITEM_TOMBSTONE_PRUNE_INTERVAL)
@@ -0,0 +1,67 @@
+from typing import List, Tuple
+
+from pydantic import ValidationError
+
+from src.core.config import settings
+from src.db.session import get_db_context
+from src.models import ItemCreate
+from src.repositories.item import item_repo
+from src.services.imports import (
+    ImportJob,
+    format_validation_error,
+    import_jobs,
+    iter_records,
+    remove_spool,
+)
+
+
+def run_item_import(job_id: str, path: str, fmt: str) -> None:
+    """
+    Streams a spooled CSV/NDJSON upload into the job owner's items.
+    Rows are validated against ItemCreate one by one and inserted ITEM_IMPORT_CHUNK_SIZE
+    at a time, so memory stays bounded by the chunk size rather than the file size.
+    Runs synchronously; call it from a background task or worker thread.
+    """
+    job = import_jobs.get(job_id)
+    if job is None:
+        remove_spool(path)
+        return
+    job.status = "running"
+    try:
+        with open(path, "rb") as raw, get_db_context() as db:
+            chunk: List[Tuple[int, ItemCreate]] = []
+            for row, record in iter_records(raw, fmt):
+                job.rows_processed += 1
+                job.bytes_read = raw.tell()
+                if isinstance(record, Exception):
+                    job.add_error(row, f"Could not parse row: {record}")
+                    continue
+                try:
+                    chunk.append((row, ItemCreate.model_validate(record)))
+                except ValidationError as e:
+                    job.add_error(row, format_validation_error(e))
+                    continue
+                if len(chunk) >= settings.ITEM_IMPORT_CHUNK_SIZE:
+                    _flush(db, job, chunk)
+                    chunk = []
+            if chunk:
+                _flush(db, job, chunk)
+        job.bytes_read = job.total_bytes
+        job.status = "completed"
+    except Exception as e:
+        job.status = "failed"
+        job.detail = f"Import stopped after {job.rows_processed} rows: {e}"
+    finally:
+        remove_spool(path)
+
+
+def _flush(db, job: ImportJob, chunk: List[Tuple[int, ItemCreate]]) -> None:
+    """Inserts one validated chunk and records the rows rejected as duplicates."""
+    results = item_repo.create_many_for_owner(
+        db=db, objs_in=[item_in for _, item_in in chunk], owner_id=job.owner_id
+    )
+    for (row, _), error in zip(chunk, results):
+        if error:
+            job.add_error(row, error)
+        else:
+            job.rows_imported += 1
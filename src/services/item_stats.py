@@ -0,0 +1,36 @@
+import asyncio
+import logging
+
+from nicegui import run
+
+from src.core.config import settings
+from src.db.session import get_db_context
+from src.db.shards import shard_router
+from src.repositories.item_stats import item_stats_repo
+
+logger = logging.getLogger(__name__)
+
+
+def reconcile_item_stats() -> int:
+    """Recomputes the per-owner item statistics and returns the number of owners corrected."""
+    if shard_router.enabled:
+        return sum(shard_router.scatter(item_stats_repo.reconcile))
+    with get_db_context() as db:
+        return item_stats_repo.reconcile(db)
+
+
+async def reconcile_item_stats_periodically() -> None:
+    """
+    Reconciles item statistics once at startup, then every ITEM_STATS_RECONCILE_INTERVAL
+    seconds, in a worker thread so the event loop is never blocked by the full-table count.
+    """
+    while True:
+        try:
+            fixed = await run.io_bound(reconcile_item_stats)
+            if fixed:
+                logger.info("Item statistics reconciled, %s owners corrected.", fixed)
+        except Exception:
+            logger.exception("Item statistics reconciliation failed.")
+        if settings.ITEM_STATS_RECONCILE_INTERVAL <= 0:
+            return
+        await asyncio.sleep(settings.ITEM_STATS_RECONCILE_INTERVAL)
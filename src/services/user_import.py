@@ -0,0 +1,211 @@
+import csv
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from src.core.config import settings
+from src.core.security import get_password_hash
+from src.db.session import get_db_context
+from src.models import UserCreate
+from src.repositories.user import user_repo
+from src.services.imports import (
+    ImportJob,
+    format_validation_error,
+    import_jobs,
+    iter_records,
+    new_spool_path,
+    remove_spool,
+)
+
+RESULT_COLUMNS = ["row", "email", "status", "user_id", "error"]
+# A row's outcome: (row, email, created user ID, rejection reason)
+Outcome = Tuple[int, Optional[str], Optional[int], Optional[str]]
+# Leading characters that make spreadsheets evaluate a cell as a formula.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class PasswordHasher:
+    """
+    Hashes passwords on a lazily started pool of PASSWORD_HASH_WORKERS processes.
+    bcrypt is deliberately slow, so a batch of users is hashed in parallel across
+    CPUs instead of one after another in the importing thread. Workers are spawned rather
+    than forked: the server is multithreaded, and a fork taken while another thread holds
+    a lock (logging, tracing, the UI database pool) would deadlock the child.
+    """
+
+    def __init__(self) -> None:
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        return settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        """Returns the bcrypt hashes of the passwords, in order."""
+        if len(passwords) < 2 or self.workers == 1:
+            return [get_password_hash(password) for password in passwords]
+        chunksize = max(len(passwords) // (self.workers * 4), 1)
+        return list(
+            self.executor.map(get_password_hash, passwords, chunksize=chunksize)
+        )
+
+    def shutdown(self) -> None:
+        """Stops the worker processes once queued hashes have finished."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+def run_user_import(job_id: str, path: str, fmt: str) -> None:
+    """
+    Streams a spooled CSV/NDJSON upload of users (email, password, and optionally
+    full_name, is_active, is_superuser) into the database.
+    Rows are validated against UserCreate and processed USER_IMPORT_CHUNK_SIZE at a time:
+    one query finds the chunk's emails that are already taken, the remaining passwords
+    are hashed in parallel, and the users are inserted with a single executemany.
+    Memory stays bounded by the chunk size: an email repeated within a chunk is rejected
+    there, and one repeating an earlier chunk is found by that query, since the earlier
+    row is in the database by then. Every row's outcome is written to the job's result CSV. Runs synchronously; call it
+    from a background task or worker thread.
+    """
+    job = import_jobs.get(job_id)
+    if job is None:
+        remove_spool(path)
+        return
+    job.status = "running"
+    job.result_path = new_spool_path()
+    try:
+        with (
+            open(path, "rb") as raw,
+            open(job.result_path, "w", newline="", encoding="utf-8") as result_file,
+            get_db_context() as db,
+        ):
+            results = csv.writer(result_file)
+            results.writerow(RESULT_COLUMNS)
+            # Emails of the pending chunk
+            seen: Set[str] = set()
+            chunk: List[Tuple[int, UserCreate]] = []
+            # Outcomes of rejected rows wait for their chunk, to keep the results in row order
+            rejected: List[Outcome] = []
+            for row, record in iter_records(raw, fmt):
+                if len(chunk) + len(rejected) >= settings.USER_IMPORT_CHUNK_SIZE:
+                    _record(job, results, _flush(db, chunk) + rejected)
+                    chunk, rejected = [], []
+                    seen.clear()
+                job.rows_processed += 1
+                job.bytes_read = raw.tell()
+                if isinstance(record, Exception):
+                    rejected.append((row, None, None, f"Could not parse row: {record}"))
+                    continue
+                try:
+                    # Empty CSV cells fall back to the field defaults
+                    user_in = UserCreate.model_validate(
+                        {key: value for key, value in record.items() if value != ""}
+                    )
+                except ValidationError as e:
+                    rejected.append(
+                        (row, record.get("email"), None, format_validation_error(e))
+                    )
+                    continue
+                if user_in.email in seen:
+                    rejected.append(
+                        (
+                            row,
+                            user_in.email,
+                            None,
+                            "The email appears earlier in the file.",
+                        )
+                    )
+                    continue
+                seen.add(user_in.email)
+                chunk.append((row, user_in))
+            _record(job, results, _flush(db, chunk) + rejected)
+        job.bytes_read = job.total_bytes
+        job.status = "completed"
+    except Exception as e:
+        job.status = "failed"
+        job.detail = f"Import stopped after {job.rows_processed} rows: {e}"
+    finally:
+        remove_spool(path)
+
+
+def _flush(db, chunk: List[Tuple[int, UserCreate]]) -> List[Outcome]:
+    """Inserts one validated chunk, rejecting the rows whose email is already taken."""
+    if not chunk:
+        return []
+    existing = user_repo.get_existing_emails(
+        db, emails=[user_in.email for _, user_in in chunk]
+    )
+    new = [(row, user_in) for row, user_in in chunk if user_in.email not in existing]
+    hashed_passwords = password_hasher.hash_many(
+        [user_in.password for _, user_in in new]
+    )
+    try:
+        ids = user_repo.create_many(
+            db,
+            objs_in=[user_in for _, user_in in new],
+            hashed_passwords=hashed_passwords,
+        )
+    except IntegrityError:
+        # A user was created with one of the emails since the check: check again
+        db.rollback()
+        existing |= user_repo.get_existing_emails(
+            db, emails=[user_in.email for _, user_in in new]
+        )
+        kept = [
+            (entry, hashed)
+            for entry, hashed in zip(new, hashed_passwords)
+            if entry[1].email not in existing
+        ]
+        new = [entry for entry, _ in kept]
+        ids = user_repo.create_many(
+            db,
+            objs_in=[user_in for _, user_in in new],
+            hashed_passwords=[hashed for _, hashed in kept],
+        )
+
+    created = dict(zip((row for row, _ in new), ids))
+    return [
+        (row, user_in.email, created[row], None)
+        if row in created
+        else (row, user_in.email, None, "A user with this email already exists.")
+        for row, user_in in chunk
+    ]
+
+
+def _cell(value: Optional[str]) -> str:
+    """Quotes text from the upload so a spreadsheet opening the result CSV shows it as text."""
+    if value and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value or ""
+
+
+def _record(job: ImportJob, results, outcomes: List[Outcome]) -> None:
+    """Counts the outcomes on the job and writes them to the result CSV in row order."""
+    for row, email, user_id, error in sorted(outcomes, key=lambda outcome: outcome[0]):
+        if error:
+            job.add_error(row, error)
+            results.writerow([row, _cell(email), "rejected", "", _cell(error)])
+        else:
+            job.rows_imported += 1
+            results.writerow([row, _cell(email), "created", user_id, ""])
+
+
+password_hasher = PasswordHasher()